@@ -0,0 +1,194 @@
+"""
+Benchmarks for bst.py
+
+Times insert, the three traversals and isBST over several
+key distributions and tree sizes, and records the peak
+memory and final height of each tree. Results are written
+as JSON so two runs can be compared.
+
+Usage:
+    python bench_bst.py [--sizes 1000 10000 ...] [--modes balanced plain]
+                        [--distributions random sorted ...] [--repeat N]
+                        [--seed S] [--no-memory] [--output results.json]
+    python bench_bst.py --compare old.json new.json [--threshold 1.2]
+
+The default sizes are 1e3 to 1e5; pass --sizes up to 1e7 for
+a full run. Plain (unbalanced) inserts on sorted, reverse or
+zig-zag keys build a tree as deep as it has keys, so each
+insert walks the whole tree and building it is O(n^2). Those
+cases are skipped above --plain-limit keys (5000 by default)
+and recorded as skipped instead of a time.
+"""
+import argparse
+import json
+import platform
+import random
+import sys
+import time
+import tracemalloc
+
+from bst import insert, getInorder, getPreorder, getPostorder, isBST, getHeight
+
+
+'''
+Key distributions. Each function returns a list of the
+n keys 0..n-1 in the order they will be inserted.
+'''
+def randomKeys(n, rng):
+    keys = list(range(n))
+    rng.shuffle(keys)
+    return keys
+
+def sortedKeys(n, rng):
+    return list(range(n))
+
+def reverseKeys(n, rng):
+    return list(range(n - 1, -1, -1))
+
+def zigzagKeys(n, rng):
+    # 0, n-1, 1, n-2, ... closes in on the middle from both ends
+    keys = []
+    lo = 0
+    hi = n - 1
+    while lo <= hi:
+        keys.append(lo)
+        if lo != hi:
+            keys.append(hi)
+        lo += 1
+        hi -= 1
+    return keys
+
+DISTRIBUTIONS = {
+    "random": randomKeys,
+    "sorted": sortedKeys,
+    "reverse": reverseKeys,
+    "zigzag": zigzagKeys,
+}
+
+MODES = ["balanced", "plain"]
+
+
+def buildTree(keys, balanced):
+    root = None
+    for key in keys:
+        root = insert(root, key, balanced)
+    return root
+
+def timeIt(func, repeat):
+    best = None
+    result = None
+    for i in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        elapsed = time.perf_counter() - start
+        if best == None or elapsed < best:
+            best = elapsed
+    return best, result
+
+
+'''
+Runs one benchmark case and returns its result as a dict.
+Times are the best of repeat runs, in seconds.
+'''
+def runCase(distribution, n, mode, repeat, seed, measureMemory, plainLimit):
+    rng = random.Random(seed)
+    keys = DISTRIBUTIONS[distribution](n, rng)
+    balanced = mode == "balanced"
+    result = {"distribution": distribution, "size": n, "mode": mode}
+    if not balanced and distribution != "random" and n > plainLimit:
+        result["skipped"] = "degenerate plain tree above --plain-limit"
+        return result
+    result["insert_s"], root = timeIt(lambda: buildTree(keys, balanced), repeat)
+    result["height"] = getHeight(root)
+    result["inorder_s"] = timeIt(lambda: getInorder(root), repeat)[0]
+    result["preorder_s"] = timeIt(lambda: getPreorder(root), repeat)[0]
+    result["postorder_s"] = timeIt(lambda: getPostorder(root), repeat)[0]
+    result["isbst_s"] = timeIt(lambda: isBST(root), repeat)[0]
+    del root
+    if measureMemory:
+        # measured in a separate build so tracing doesn't skew the times
+        tracemalloc.start()
+        root = buildTree(keys, balanced)
+        result["peak_bytes"] = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+        del root
+    return result
+
+
+def runBenchmarks(args):
+    results = []
+    for n in args.sizes:
+        for distribution in args.distributions:
+            for mode in args.modes:
+                result = runCase(distribution, n, mode, args.repeat, args.seed, not args.no_memory,
+                                 args.plain_limit)
+                results.append(result)
+                if "skipped" in result:
+                    print("%-8s %-8s %10d  skipped: %s" % (distribution, mode, n, result["skipped"]))
+                else:
+                    print("%-8s %-8s %10d  insert %.4fs  inorder %.4fs  isBST %.4fs  height %d"
+                          % (distribution, mode, n, result["insert_s"], result["inorder_s"],
+                             result["isbst_s"], result["height"]))
+    return {
+        "python": platform.python_version(),
+        "implementation": platform.python_implementation(),
+        "platform": platform.platform(),
+        "seed": args.seed,
+        "repeat": args.repeat,
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "results": results,
+    }
+
+
+'''
+Compares two result files and prints the ratio new/old of
+every metric the two runs share. Ratios above threshold
+are marked as regressions. Returns the number of them.
+'''
+def compareResults(oldPath, newPath, threshold):
+    with open(oldPath) as f:
+        old = json.load(f)
+    with open(newPath) as f:
+        new = json.load(f)
+    oldCases = {}
+    for result in old["results"]:
+        oldCases[(result["distribution"], result["size"], result["mode"])] = result
+    regressions = 0
+    for result in new["results"]:
+        case = (result["distribution"], result["size"], result["mode"])
+        if case not in oldCases:
+            continue
+        before = oldCases[case]
+        for metric in ["insert_s", "inorder_s", "preorder_s", "postorder_s", "isbst_s", "peak_bytes", "height"]:
+            if metric not in before or metric not in result or before[metric] == 0:
+                continue
+            ratio = result[metric] / before[metric]
+            flag = ""
+            if ratio > threshold:
+                flag = "  REGRESSION"
+                regressions += 1
+            print("%-8s %-8s %10d  %-12s %.2fx%s" % (case[0], case[2], case[1], metric, ratio, flag))
+    return regressions
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Benchmark bst.py")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000, 100000])
+    parser.add_argument("--distributions", nargs="+", choices=list(DISTRIBUTIONS), default=list(DISTRIBUTIONS))
+    parser.add_argument("--modes", nargs="+", choices=MODES, default=MODES)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=2021)
+    parser.add_argument("--plain-limit", type=int, default=5000,
+                        help="largest size for plain trees on sorted, reverse or zigzag keys")
+    parser.add_argument("--no-memory", action="store_true", help="skip the peak memory measurement")
+    parser.add_argument("--output", default="bench_results.json")
+    parser.add_argument("--compare", nargs=2, metavar=("OLD", "NEW"))
+    parser.add_argument("--threshold", type=float, default=1.2)
+    args = parser.parse_args()
+
+    if args.compare:
+        sys.exit(1 if compareResults(args.compare[0], args.compare[1], args.threshold) else 0)
+    report = runBenchmarks(args)
+    with open(args.output, "w") as f:
+        json.dump(report, f, indent=2)
+    print("Results written to", args.output)
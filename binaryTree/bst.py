@@ -8,6 +8,69 @@ Python program to for binary tree insertion and traversals
 from bst_node import Node
 
 
+'''
+A generator that yields the values of a binary tree
+in inorder (left, root, right). It walks the tree with
+an explicit stack so very deep trees don't hit the
+recursion limit.
+'''
+def inorderIter(root):
+    stack = []
+    node = root
+    while stack or node != None:
+        while node != None:
+            stack.append(node)
+            node = node.left
+        node = stack.pop()
+        yield node.val
+        node = node.right
+
+'''
+A generator that yields the values of a binary tree
+in preorder (root, left, right) using an explicit stack.
+'''
+def preorderIter(root):
+    if root == None:
+        return
+    stack = [root]
+    while stack:
+        node = stack.pop()
+        yield node.val
+        # push right first so the left subtree is visited first
+        if node.right != None:
+            stack.append(node.right)
+        if node.left != None:
+            stack.append(node.left)
+
+'''
+A generator that yields the values of a binary tree
+in postorder (left, right, root) using an explicit stack.
+'''
+def postorderIter(root):
+    stack = []
+    node = root
+    lastVisited = None
+    while stack or node != None:
+        if node != None:
+            stack.append(node)
+            node = node.left
+            continue
+        top = stack[-1]
+        # go right if there is a right subtree we haven't finished yet
+        if top.right != None and top.right is not lastVisited:
+            node = top.right
+        else:
+            stack.pop()
+            yield top.val
+            lastVisited = top
+
+'''
+Joins the values from one of the traversal generators
+into a string where each value is followed by a '-'.
+'''
+def _joinTraversal(values):
+    return "".join([str(val) + "-" for val in values])
+
 '''
 A function that returns a string of the inorder 
 traversal of a binary tree. 
@@ -15,9 +78,7 @@ Each node on the tree should be followed by a '-'.
 Ex. "1-2-3-4-5-"
 '''
 def getInorder(root):
-    if root == None:
-        return ""
-    return str(getInorder(root.left)) + str(root.val) + "-" + str(getInorder(root.right))
+    return _joinTraversal(inorderIter(root))
 
 '''
 A function that returns a string of the postorder 
@@ -25,11 +86,8 @@ traversal of a binary tree.
 Each node on the tree should be followed by a '-'.
 Ex. "1-2-3-4-5-"
 '''
-# A function to do postorder tree traversal
 def getPostorder(root):
-    if root == None:
-        return ""
-    return str(getPostorder(root.left)) + str(getPostorder(root.right)) + str(root.val) + "-"
+    return _joinTraversal(postorderIter(root))
 
 
 '''
@@ -39,9 +97,7 @@ Each node on the tree should be followed by a '-'.
 Ex. "1-2-3-4-5-"
 '''
 def getPreorder(root):
-    if root == None:
-        return ""
-    return str(root.val) + "-" + str(getPreorder(root.left)) + str(getPreorder(root.right))
+    return _joinTraversal(preorderIter(root))
 
 '''
 A function that inserts a Node with the value
@@ -49,35 +105,316 @@ key in the proper position of the BST with the
 provided root. The function will return the 
 original root with no change if the key already
 exists in the tree.
+If balanced is True the tree is kept AVL balanced
+with rotations, so the root that is returned may be
+a different node than the one passed in.
+Without balancing the tree can be as deep as it has keys
+(e.g. for sorted keys), so the walk down is a loop rather
+than recursion and never hits the recursion limit.
+'''
+def insert(root, key, balanced=False):
+    if balanced:
+        return _insertBalanced(root, key)
+    if root == None:
+        return Node(key)
+    path = []
+    node = root
+    while node != None:
+        if key == node.val:
+            return root
+        path.append(node)
+        if key < node.val:
+            node = node.left
+        else:
+            node = node.right
+    parent = path[-1]
+    if key < parent.val:
+        parent.left = Node(key)
+    else:
+        parent.right = Node(key)
+    # heights and sizes change along the path, bottom up
+    for node in reversed(path):
+        _update(node)
+    return root
+
+
 '''
-def insert(root, key):
+A function that returns the Node holding key, or
+None if the key is not in the tree.
+'''
+def search(root, key):
+    node = root
+    while node != None:
+        if key == node.val:
+            return node
+        if key < node.val:
+            node = node.left
+        else:
+            node = node.right
+    return None
+
+
+'''
+Helpers for the balanced (AVL) insert. Every node
+stores the height of its subtree and the difference
+between the left and right heights is kept in [-1, 1].
+Nodes also store the size of their subtree, which
+both kinds of insert keep up to date.
+'''
+def getHeight(node):
+    if node == None:
+        return 0
+    return node.height
+
+def getSize(node):
+    if node == None:
+        return 0
+    return node.size
+
+def _update(node):
+    node.height = 1 + max(getHeight(node.left), getHeight(node.right))
+    node.size = 1 + getSize(node.left) + getSize(node.right)
+
+def _balanceFactor(node):
+    return getHeight(node.left) - getHeight(node.right)
+
+def _rotateRight(node):
+    newRoot = node.left
+    node.left = newRoot.right
+    newRoot.right = node
+    _update(node)
+    _update(newRoot)
+    return newRoot
+
+def _rotateLeft(node):
+    newRoot = node.right
+    node.right = newRoot.left
+    newRoot.left = node
+    _update(node)
+    _update(newRoot)
+    return newRoot
+
+def _rebalance(node):
+    _update(node)
+    balance = _balanceFactor(node)
+    if balance > 1:
+        # left-right case becomes left-left with one rotation
+        if _balanceFactor(node.left) < 0:
+            node.left = _rotateLeft(node.left)
+        return _rotateRight(node)
+    if balance < -1:
+        # right-left case becomes right-right with one rotation
+        if _balanceFactor(node.right) > 0:
+            node.right = _rotateRight(node.right)
+        return _rotateLeft(node)
+    return node
+
+def _insertBalanced(root, key):
     if root == None:
         return Node(key)
     if key == root.val:
         return root
     if key < root.val:
-        root.left = insert(root.left, key)
-        return root
-    if key > root.val:
-        root.right = insert(root.right,key)
-        return root
+        root.left = _insertBalanced(root.left, key)
+    else:
+        root.right = _insertBalanced(root.right, key)
+    return _rebalance(root)
 
 
 
+'''
+A function that builds a perfectly balanced BST from
+an iterable of keys and returns its root. Sorted input
+is built in O(n). Unsorted input is sorted first, and
+duplicate keys are dropped just like insert drops them.
+'''
+def buildBalanced(keys):
+    keys = list(keys)
+    isSorted = True
+    for i in range(len(keys) - 1):
+        if not keys[i] < keys[i+1]:
+            isSorted = False
+            break
+    if not isSorted:
+        keys = sorted(keys)
+        # drop duplicates, which are now next to each other
+        unique = []
+        for key in keys:
+            if not unique or unique[-1] != key:
+                unique.append(key)
+        keys = unique
+    return _buildRange(keys, 0, len(keys) - 1)
+
+def _buildRange(keys, lo, hi):
+    if lo > hi:
+        return None
+    mid = (lo + hi) // 2
+    node = Node(keys[mid])
+    node.left = _buildRange(keys, lo, mid - 1)
+    node.right = _buildRange(keys, mid + 1, hi)
+    _update(node)
+    return node
+
+
+
+'''
+A generator that merges two sorted iterators of keys into
+one sorted stream, yielding a key that is in both only
+once.
+'''
+def _mergeSorted(first, second):
+    done = object()
+    a = next(first, done)
+    b = next(second, done)
+    while a is not done and b is not done:
+        if a < b:
+            yield a
+            a = next(first, done)
+        elif b < a:
+            yield b
+            b = next(second, done)
+        else:
+            yield a
+            a = next(first, done)
+            b = next(second, done)
+    while a is not done:
+        yield a
+        a = next(first, done)
+    while b is not done:
+        yield b
+        b = next(second, done)
+
+'''
+A function that merges two BSTs into a new balanced BST
+in O(n + m): both trees are walked in order, the two
+sorted streams are merged, and the result is bulk-loaded.
+The nodes of the original trees are not reused.
+'''
+def merge(root1, root2):
+    return buildBalanced(_mergeSorted(inorderIter(root1), inorderIter(root2)))
+
+'''
+A function that inserts a batch of keys at once and
+returns the root of a new balanced tree. The batch is
+sorted and deduplicated, then merge-walked against the
+tree's keys, so it costs O(n + b log b) instead of b
+separate inserts. Unlike insert, every call rebuilds the
+whole tree, even for a single key, and the tree passed in
+is left untouched, so keep using the returned root.
+'''
+def insertBatch(root, keys):
+    batch = []
+    for key in sorted(keys):
+        # duplicates are next to each other after sorting
+        if not batch or batch[-1] != key:
+            batch.append(key)
+    return buildBalanced(_mergeSorted(inorderIter(root), iter(batch)))
+
+
+'''
+A generator that yields the keys in [lo, hi] in order.
+Subtrees that are entirely below lo or above hi are
+never visited, so a query costs O(log n + k) on a
+balanced tree where k is the number of keys yielded.
+'''
+def range_iter(root, lo, hi):
+    stack = []
+    node = root
+    while stack or node != None:
+        while node != None:
+            if node.val < lo:
+                # everything on the left is also below lo
+                node = node.right
+            else:
+                stack.append(node)
+                node = node.left
+        if not stack:
+            return
+        node = stack.pop()
+        if node.val > hi:
+            # every key still to come is larger
+            return
+        yield node.val
+        node = node.right
+
+
+'''
+Order statistic queries. These use the subtree sizes
+kept by insert and buildBalanced, so they only give the
+right answer on trees built with those functions, and
+they run in O(log n) on a balanced tree.
+'''
+
+'''
+A function that returns how many keys in the tree
+are smaller than key.
+'''
+def rank(root, key):
+    return _countBelow(root, key, False)
+
+'''
+A function that returns the k-th smallest key in the
+tree, counting from 0, so select(root, rank(root, key))
+is key for any key in the tree.
+'''
+def select(root, k):
+    if k < 0 or k >= getSize(root):
+        raise IndexError("select index out of range")
+    node = root
+    while True:
+        leftSize = getSize(node.left)
+        if k == leftSize:
+            return node.val
+        if k < leftSize:
+            node = node.left
+        else:
+            k = k - leftSize - 1
+            node = node.right
+
+'''
+A function that returns how many keys in the tree
+fall in the range [lo, hi].
+'''
+def count_range(root, lo, hi):
+    if hi < lo:
+        return 0
+    return _countBelow(root, hi, True) - _countBelow(root, lo, False)
+
+def _countBelow(root, key, inclusive):
+    count = 0
+    node = root
+    while node != None:
+        if node.val < key or (inclusive and node.val == key):
+            count = count + getSize(node.left) + 1
+            node = node.right
+        else:
+            node = node.left
+    return count
+
+
 '''
 Challenge: A function determines if a binary tree 
 is a valid binary search tree
+It walks the tree once, carrying the lower and upper
+bound each node has to fall between, and stops at the
+first node that breaks them. Only < and > are used on
+the keys so it works for any ordered key type.
 '''
 def isBST(root):
-    inorderString = getInorder(root)
-    inorderList = inorderString.split('-')
-    inorderList = inorderList[0:-1]
-    length = len(inorderList)
-    for i in range(length-1):
-        first = int(inorderList[i])
-        second = int(inorderList[i+1])
-        if first > second:
+    if root == None:
+        return True
+    # each entry is (node, lower bound, upper bound), None means no bound
+    stack = [(root, None, None)]
+    while stack:
+        node, low, high = stack.pop()
+        if low != None and node.val < low.val:
+            return False
+        if high != None and node.val > high.val:
             return False
+        if node.right != None:
+            stack.append((node.right, node, high))
+        if node.left != None:
+            stack.append((node.left, low, node))
     return True
 
 
@@ -8,7 +8,18 @@ A class that represents an individual node in a Binary Tree
 
 
 class Node:
+    # __slots__ stops every node from carrying its own __dict__,
+    # which takes the cost of a node from ~112 to ~72 bytes
+    # (see memory_footprint.py)
+    __slots__ = ("left", "right", "val", "height", "size")
+
     def __init__(self, key):
         self.left = None
         self.right = None
         self.val = key
+        # height of the subtree rooted here, kept up to date by
+        # the balanced (AVL) insert in bst.py
+        self.height = 1
+        # number of nodes in the subtree rooted here, used by the
+        # rank/select queries in bst.py
+        self.size = 1
@@ -0,0 +1,147 @@
+"""
+Binary serialization for trees built with bst.py
+
+A tree is stored as a short header followed by its keys in
+preorder, each key zigzag encoded and written as a varint
+(small keys take 1-2 bytes, any Python int fits). Because
+a BST is fully determined by its preorder, loading rebuilds
+the exact same shape in O(n) without re-inserting anything.
+
+Only int keys are supported.
+"""
+import mmap
+
+from bst_node import Node
+from bst import preorderIter, _update
+
+MAGIC = b"BST\x01"
+
+# how many encoded bytes to collect before each write
+_CHUNK_SIZE = 1 << 16
+
+
+def _zigzag(key):
+    # maps 0, -1, 1, -2, 2, ... to 0, 1, 2, 3, 4, ...
+    if key >= 0:
+        return key << 1
+    return ((-key) << 1) - 1
+
+def _unzigzag(value):
+    if value & 1:
+        return -((value + 1) >> 1)
+    return value >> 1
+
+def _appendVarint(out, value):
+    while value > 0x7F:
+        out.append((value & 0x7F) | 0x80)
+        value >>= 7
+    out.append(value)
+
+
+'''
+A function that writes the tree with the given root to an
+open binary file. Keys are encoded as the preorder walk
+produces them, so the whole tree is never held in memory
+as bytes.
+'''
+def writeTree(root, fileObj):
+    fileObj.write(MAGIC)
+    out = bytearray()
+    for key in preorderIter(root):
+        if type(key) != int:
+            raise TypeError("only int keys can be serialized, got " + type(key).__name__)
+        _appendVarint(out, _zigzag(key))
+        if len(out) >= _CHUNK_SIZE:
+            fileObj.write(out)
+            out = bytearray()
+    fileObj.write(out)
+
+def saveTree(root, path):
+    with open(path, "wb") as f:
+        writeTree(root, f)
+
+
+'''
+A generator that decodes the keys from a serialized tree.
+data can be anything that supports the buffer protocol,
+such as bytes or an mmap.
+'''
+def readKeys(data):
+    view = memoryview(data)
+    if bytes(view[:len(MAGIC)]) != MAGIC:
+        raise ValueError("not a serialized BST")
+    value = 0
+    shift = 0
+    for byte in view[len(MAGIC):]:
+        value |= (byte & 0x7F) << shift
+        if byte & 0x80:
+            shift += 7
+        else:
+            yield _unzigzag(value)
+            value = 0
+            shift = 0
+    if shift != 0:
+        raise ValueError("serialized BST ends in the middle of a key")
+
+
+'''
+A function that rebuilds a tree from its preorder keys in
+O(n). The stack holds the path of nodes that can still get
+a right child; a key larger than the top of the stack
+belongs in the right subtree of the last node it passes.
+Heights and sizes are filled in afterwards so the result
+works with balanced insert and the rank/select queries.
+'''
+def buildFromPreorder(keys):
+    root = None
+    stack = []
+    for key in keys:
+        node = Node(key)
+        if root == None:
+            root = node
+        elif key < stack[-1].val:
+            stack[-1].left = node
+        else:
+            parent = stack.pop()
+            while stack and stack[-1].val < key:
+                parent = stack.pop()
+            parent.right = node
+        stack.append(node)
+    _fixMetadata(root)
+    return root
+
+def _fixMetadata(root):
+    # iterative postorder so children are updated before parents
+    stack = []
+    node = root
+    lastVisited = None
+    while stack or node != None:
+        if node != None:
+            stack.append(node)
+            node = node.left
+            continue
+        top = stack[-1]
+        if top.right != None and top.right is not lastVisited:
+            node = top.right
+        else:
+            stack.pop()
+            _update(top)
+            lastVisited = top
+
+
+def readTree(data):
+    return buildFromPreorder(readKeys(data))
+
+'''
+A function that loads a tree saved with saveTree. With
+useMmap the file is memory mapped instead of read into a
+bytes object, so the OS pages it in as it is decoded.
+'''
+def loadTree(path, useMmap=True):
+    with open(path, "rb") as f:
+        if not useMmap:
+            return readTree(f.read())
+        if f.seek(0, 2) == 0:
+            raise ValueError("not a serialized BST")
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+            return readTree(data)
@@ -0,0 +1,339 @@
+"""
+Disk-backed B-tree
+
+A B-tree of 64-bit int keys stored in a memory-mapped
+file, for key sets that don't fit in memory as Node
+objects. The file is split into fixed-size pages; page 0
+holds the metadata and every other page holds one B-tree
+node.
+Decoded pages are kept in an LRU cache and written back
+to the map when they are evicted or on flush().
+
+It has the same semantics as bst.py: insert ignores keys
+that are already present, the traversals produce the same
+"1-2-3-" strings, and range_iter yields the keys in
+[lo, hi] in order without visiting pages outside it.
+
+Usage:
+    with BTree("keys.btree", pageSize=4096) as tree:
+        tree.insert(5)
+        print(tree.getInorder())
+"""
+import bisect
+import mmap
+import os
+import struct
+from collections import OrderedDict
+
+MAGIC = b"BTR\x02"
+# magic, page size, root page, page count, key count
+_META = struct.Struct("<4sIIIQ")
+# is leaf, key count
+_PAGE_HEADER = struct.Struct("<B3xI")
+_KEY_SIZE = 8
+_CHILD_SIZE = 4
+
+
+class Page:
+    def __init__(self, pageId, isLeaf):
+        self.pageId = pageId
+        self.isLeaf = isLeaf
+        self.keys = []
+        self.children = []
+        self.dirty = True
+
+
+class BTree:
+    def __init__(self, path, pageSize=4096, cachePages=1024):
+        if cachePages < 1:
+            raise ValueError("cachePages must be at least 1")
+        self.cachePages = cachePages
+        self.cache = OrderedDict()
+        # pages an insert is still changing; these are never evicted
+        self.pinned = set()
+        self.pinning = False
+        exists = os.path.exists(path) and os.path.getsize(path) > 0
+        self.file = open(path, "r+b" if exists else "w+b")
+        if exists:
+            self.map = mmap.mmap(self.file.fileno(), 0)
+            magic, pageSize, self.rootId, self.numPages, self.count = _META.unpack_from(self.map, 0)
+            if magic != MAGIC:
+                raise ValueError(path + " is not a B-tree file")
+        else:
+            if pageSize < _META.size:
+                raise ValueError("page size is too small")
+            self.file.truncate(pageSize * 16)
+            self.map = mmap.mmap(self.file.fileno(), 0)
+            self.numPages = 1
+            self.count = 0
+            self.rootId = 0
+        self.pageSize = pageSize
+        # the largest odd number of keys that fits in a page,
+        # leaving room for one more child pointer than keys
+        maxKeys = (pageSize - _PAGE_HEADER.size - _CHILD_SIZE) // (_KEY_SIZE + _CHILD_SIZE)
+        if maxKeys % 2 == 0:
+            maxKeys -= 1
+        if maxKeys < 3:
+            raise ValueError("page size is too small")
+        self.maxKeys = maxKeys
+        # minimum degree, every node but the root has at least degree-1 keys
+        self.degree = (maxKeys + 1) // 2
+        self._keysFormat = struct.Struct("<%dq" % maxKeys)
+        self._childrenFormat = struct.Struct("<%dI" % (maxKeys + 1))
+        if not exists:
+            self.rootId = self._newPage(True).pageId
+            self._writeMeta()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def __len__(self):
+        return self.count
+
+    '''
+    Page storage: pages are decoded into Page objects on
+    first use and kept in an LRU cache of cachePages pages.
+    '''
+    def _readPage(self, pageId):
+        offset = pageId * self.pageSize
+        isLeaf, numKeys = _PAGE_HEADER.unpack_from(self.map, offset)
+        page = Page(pageId, bool(isLeaf))
+        offset += _PAGE_HEADER.size
+        page.keys = list(self._keysFormat.unpack_from(self.map, offset)[:numKeys])
+        if not page.isLeaf:
+            offset += self._keysFormat.size
+            page.children = list(self._childrenFormat.unpack_from(self.map, offset)[:numKeys + 1])
+        page.dirty = False
+        return page
+
+    def _writePage(self, page):
+        offset = page.pageId * self.pageSize
+        _PAGE_HEADER.pack_into(self.map, offset, int(page.isLeaf), len(page.keys))
+        offset += _PAGE_HEADER.size
+        padding = self.maxKeys - len(page.keys)
+        self._keysFormat.pack_into(self.map, offset, *(page.keys + [0] * padding))
+        if not page.isLeaf:
+            offset += self._keysFormat.size
+            self._childrenFormat.pack_into(self.map, offset, *(page.children + [0] * padding))
+        page.dirty = False
+
+    def _getPage(self, pageId):
+        if self.pinning:
+            self.pinned.add(pageId)
+        page = self.cache.get(pageId)
+        if page != None:
+            self.cache.move_to_end(pageId)
+            return page
+        page = self._readPage(pageId)
+        self._cachePage(page)
+        return page
+
+    def _cachePage(self, page):
+        self.cache[page.pageId] = page
+        self._evict()
+
+    def _evict(self):
+        # drops least recently used pages until the cache fits, skipping
+        # pinned ones; if every extra page is pinned the cache stays over
+        # its size until the insert that pinned them is done
+        while len(self.cache) > self.cachePages:
+            victim = None
+            for pageId in self.cache:
+                if pageId not in self.pinned:
+                    victim = pageId
+                    break
+            if victim == None:
+                return
+            oldPage = self.cache.pop(victim)
+            if oldPage.dirty:
+                self._writePage(oldPage)
+
+    def _newPage(self, isLeaf):
+        if (self.numPages + 1) * self.pageSize > len(self.map):
+            # grow the file by doubling and map it again
+            newSize = len(self.map) * 2
+            self.map.close()
+            self.file.truncate(newSize)
+            self.map = mmap.mmap(self.file.fileno(), 0)
+        page = Page(self.numPages, isLeaf)
+        self.numPages += 1
+        if self.pinning:
+            self.pinned.add(page.pageId)
+        self._cachePage(page)
+        return page
+
+    def _writeMeta(self):
+        _META.pack_into(self.map, 0, MAGIC, self.pageSize, self.rootId, self.numPages, self.count)
+
+    '''
+    Writes every changed page and the metadata back to the
+    file.
+    '''
+    def flush(self):
+        for page in self.cache.values():
+            if page.dirty:
+                self._writePage(page)
+        self._writeMeta()
+        self.map.flush()
+
+    def close(self):
+        if self.map.closed:
+            return
+        self.flush()
+        self.map.close()
+        self.file.close()
+
+    '''
+    Inserts key into the tree. Full pages on the way down
+    are split before we enter them, so there is always room
+    to push a key up into the parent. Returns False if the
+    key was already in the tree. Keys are stored as signed
+    64-bit ints, so anything else raises TypeError or
+    ValueError before the tree is changed.
+    Every page the insert touches is pinned in the cache
+    until it is done, so a page can't be written back and
+    then changed again after it has left the cache.
+    '''
+    def insert(self, key):
+        if type(key) != int:
+            raise TypeError("only int keys can be stored, got " + type(key).__name__)
+        if not -2**63 <= key < 2**63:
+            raise ValueError("key %d does not fit in 64 bits" % key)
+        if self.contains(key):
+            return False
+        self.pinning = True
+        try:
+            self._insert(key)
+        finally:
+            self.pinning = False
+            self.pinned.clear()
+            self._evict()
+        self.count += 1
+        return True
+
+    def _insert(self, key):
+        root = self._getPage(self.rootId)
+        if len(root.keys) == self.maxKeys:
+            newRoot = self._newPage(False)
+            newRoot.children = [root.pageId]
+            self._splitChild(newRoot, 0)
+            self.rootId = newRoot.pageId
+            root = newRoot
+        page = root
+        while not page.isLeaf:
+            i = bisect.bisect_left(page.keys, key)
+            child = self._getPage(page.children[i])
+            if len(child.keys) == self.maxKeys:
+                self._splitChild(page, i)
+                if key > page.keys[i]:
+                    i += 1
+                child = self._getPage(page.children[i])
+            page = child
+        bisect.insort(page.keys, key)
+        page.dirty = True
+
+    def _splitChild(self, parent, i):
+        child = self._getPage(parent.children[i])
+        sibling = self._newPage(child.isLeaf)
+        mid = self.degree - 1
+        sibling.keys = child.keys[mid + 1:]
+        middleKey = child.keys[mid]
+        child.keys = child.keys[:mid]
+        if not child.isLeaf:
+            sibling.children = child.children[mid + 1:]
+            child.children = child.children[:mid + 1]
+        parent.keys.insert(i, middleKey)
+        parent.children.insert(i + 1, sibling.pageId)
+        child.dirty = True
+        parent.dirty = True
+
+    def contains(self, key):
+        page = self._getPage(self.rootId)
+        while True:
+            i = bisect.bisect_left(page.keys, key)
+            if i < len(page.keys) and page.keys[i] == key:
+                return True
+            if page.isLeaf:
+                return False
+            page = self._getPage(page.children[i])
+
+    '''
+    Traversals. inorderIter yields the keys in sorted order.
+    preorderIter and postorderIter yield each page's keys
+    before or after the keys of its children.
+    '''
+    def inorderIter(self):
+        return self.range_iter(None, None)
+
+    def preorderIter(self):
+        stack = [self.rootId]
+        while stack:
+            page = self._getPage(stack.pop())
+            for key in page.keys:
+                yield key
+            stack.extend(reversed(page.children))
+
+    def postorderIter(self):
+        # (page, whether its children have been pushed yet)
+        stack = [(self.rootId, False)]
+        while stack:
+            pageId, expanded = stack.pop()
+            page = self._getPage(pageId)
+            if expanded or page.isLeaf:
+                for key in page.keys:
+                    yield key
+            else:
+                stack.append((pageId, True))
+                for childId in reversed(page.children):
+                    stack.append((childId, False))
+
+    def getInorder(self):
+        return "".join([str(key) + "-" for key in self.inorderIter()])
+
+    def getPreorder(self):
+        return "".join([str(key) + "-" for key in self.preorderIter()])
+
+    def getPostorder(self):
+        return "".join([str(key) + "-" for key in self.postorderIter()])
+
+    '''
+    A generator that yields the keys in [lo, hi] in order.
+    None means no bound. Only the pages whose key ranges
+    overlap [lo, hi] are read.
+    '''
+    def range_iter(self, lo, hi):
+        # each entry is (page, index of the next key to yield)
+        stack = []
+        page = self._getPage(self.rootId)
+        while True:
+            if lo == None:
+                i = 0
+            else:
+                i = bisect.bisect_left(page.keys, lo)
+            stack.append((page, i))
+            if page.isLeaf:
+                break
+            page = self._getPage(page.children[i])
+        while stack:
+            page, i = stack.pop()
+            if i >= len(page.keys):
+                continue
+            key = page.keys[i]
+            if hi != None and key > hi:
+                return
+            if page.isLeaf:
+                stack.append((page, i + 1))
+                yield key
+                continue
+            stack.append((page, i + 1))
+            yield key
+            # walk down the leftmost path of the subtree after key
+            child = self._getPage(page.children[i + 1])
+            while True:
+                stack.append((child, 0))
+                if child.isLeaf:
+                    break
+                child = self._getPage(child.children[0])
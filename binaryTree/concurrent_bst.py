@@ -0,0 +1,91 @@
+"""
+Concurrent Binary Search Tree
+
+A thread-safe wrapper around the bst.py node layout.
+
+Readers never take a lock. Nodes are only ever added, by
+linking a finished Node into an empty child slot with one
+assignment, so a reader walking the tree always sees a
+valid BST (it may or may not see keys that are being
+inserted at the same moment).
+
+Writers are optimistic: they walk down without locking,
+then lock only the node they want to hang the new key
+from and check that the child slot is still empty. If
+another writer got there first they simply keep walking
+from that node. Locks are striped over the nodes, so
+threads inserting into different parts of the tree almost
+never wait on each other.
+
+The tree does no rebalancing (a rotation would move nodes
+under concurrent readers), so keys should arrive in a
+roughly random order. Node heights and sizes are not kept
+up to date, so rank/select from bst.py do not apply here.
+"""
+import threading
+
+from bst_node import Node
+from bst import search, inorderIter
+
+
+class ConcurrentBST:
+    def __init__(self, stripes=64):
+        self.root = None
+        self.rootLock = threading.Lock()
+        self.locks = [threading.Lock() for i in range(stripes)]
+        # counts[i] is only changed while holding locks[i]
+        self.counts = [0] * stripes
+
+    def _stripe(self, node):
+        # object ids are 16-byte aligned, so drop the low bits
+        return (id(node) >> 4) % len(self.locks)
+
+    '''
+    Inserts key into the tree. Returns True if the key was
+    added and False if it was already there.
+    '''
+    def insert(self, key):
+        node = self.root
+        if node == None:
+            with self.rootLock:
+                if self.root == None:
+                    self.root = Node(key)
+                    with self.locks[0]:
+                        self.counts[0] += 1
+                    return True
+            node = self.root
+        while True:
+            if key == node.val:
+                return False
+            if key < node.val:
+                child = node.left
+            else:
+                child = node.right
+            if child != None:
+                node = child
+                continue
+            stripe = self._stripe(node)
+            with self.locks[stripe]:
+                # check again now that we hold the lock
+                if key < node.val:
+                    if node.left == None:
+                        node.left = Node(key)
+                        self.counts[stripe] += 1
+                        return True
+                    child = node.left
+                else:
+                    if node.right == None:
+                        node.right = Node(key)
+                        self.counts[stripe] += 1
+                        return True
+                    child = node.right
+            node = child
+
+    def contains(self, key):
+        return search(self.root, key) != None
+
+    def __len__(self):
+        return sum(self.counts)
+
+    def __iter__(self):
+        return inorderIter(self.root)
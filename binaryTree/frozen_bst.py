@@ -0,0 +1,110 @@
+"""
+Frozen (read-only) Binary Search Tree
+
+freeze() turns a tree built with bst.py into a FrozenBST:
+the keys are laid out in a NumPy array in Eytzinger (BFS)
+order, so node i has its children at 2i and 2i+1 and there
+are no pointers to chase. The top levels of the tree all
+sit next to each other in memory, which keeps them cached.
+
+Lookups are vectorized: a whole array of query keys walks
+down the implicit tree together, one level per step, so a
+batch of m queries costs O(log n) NumPy operations instead
+of m Python-level searches.
+
+Requires NumPy.
+"""
+import numpy as np
+
+from bst import inorderIter
+
+
+class FrozenBST:
+    def __init__(self, sortedKeys):
+        n = len(sortedKeys)
+        self.n = n
+        # index 0 is unused so the children of i are 2i and 2i+1
+        self.keys = np.empty(n + 1, dtype=sortedKeys.dtype)
+        # ranks[i] is how many keys are smaller than keys[i]
+        self.ranks = np.zeros(n + 1, dtype=np.int64)
+        # fill the positions in inorder so they get the sorted keys in order
+        rank = 0
+        stack = []
+        i = 1
+        while stack or i <= n:
+            while i <= n:
+                stack.append(i)
+                i = 2 * i
+            i = stack.pop()
+            self.keys[i] = sortedKeys[rank]
+            self.ranks[i] = rank
+            rank += 1
+            i = 2 * i + 1
+        self.levels = n.bit_length()
+
+    def __len__(self):
+        return self.n
+
+    '''
+    Turns the queries into an array without casting them to
+    the key type, so 2.5 stays 2.5 on an int tree. NumPy then
+    compares keys and queries in their common type.
+    '''
+    def _queryArray(self, queries):
+        queries = np.asarray(queries)
+        if len(queries) == 0:
+            return queries.astype(self.keys.dtype)
+        if (self.keys.dtype.kind in "US") != (queries.dtype.kind in "US"):
+            # strings and numbers have no common type to compare in
+            raise TypeError("can't compare %s queries with %s keys" % (queries.dtype, self.keys.dtype))
+        return queries
+
+    '''
+    Returns the Eytzinger index of the smallest key that
+    is >= each query, or 0 where every key is smaller.
+    '''
+    def _lowerBound(self, queries):
+        n = self.n
+        k = np.ones(len(queries), dtype=np.int64)
+        for level in range(self.levels):
+            active = k <= n
+            goRight = self.keys[np.minimum(k, n)] < queries
+            k = np.where(active, 2 * k + goRight, k)
+        # the answer is where the walk last went left: drop the
+        # trailing right turns (1 bits) and that one left turn
+        lowestZero = ~k & (k + 1)
+        return k // (2 * lowestZero)
+
+    '''
+    Returns a boolean array saying whether each query key
+    is in the tree.
+    '''
+    def contains(self, queries):
+        queries = self._queryArray(queries)
+        if self.n == 0:
+            return np.zeros(len(queries), dtype=bool)
+        k = self._lowerBound(queries)
+        return (k != 0) & (self.keys[k] == queries)
+
+    '''
+    Returns an array with, for each query, how many keys in
+    the tree are smaller than it (the same as bst.rank).
+    '''
+    def rank(self, queries):
+        queries = self._queryArray(queries)
+        k = self._lowerBound(queries)
+        return np.where(k != 0, self.ranks[k], self.n)
+
+    def __contains__(self, key):
+        return bool(self.contains([key])[0])
+
+
+'''
+A function that returns a FrozenBST holding the keys of
+the tree with the given root. The tree is not changed.
+The array type is worked out from the keys unless dtype
+is given.
+'''
+def freeze(root, dtype=None):
+    sortedKeys = np.array(list(inorderIter(root)), dtype=dtype)
+    return FrozenBST(sortedKeys)
@@ -0,0 +1,64 @@
+"""
+Memory footprint of the binary tree nodes
+
+Builds the same balanced tree out of the slotted Node
+class from bst_node.py and out of an equivalent node
+class that keeps a per-instance __dict__ (the layout
+Node used to have), and prints the bytes used per key.
+
+Usage: python memory_footprint.py [size ...]
+The default sizes are 1,000,000 and 10,000,000 keys.
+
+Results on CPython 3.11 (64-bit), not counting the
+int keys themselves:
+
+            keys   dict bytes/key  slots bytes/key
+         1000000            112.1             72.1
+        10000000            112.2             72.2
+
+So a 10M key tree goes from ~1.1 GB to ~0.72 GB of nodes.
+"""
+import sys
+import tracemalloc
+
+import bst
+from bst_node import Node
+
+
+class DictNode:
+    def __init__(self, key):
+        self.left = None
+        self.right = None
+        self.val = key
+        self.height = 1
+        self.size = 1
+
+
+'''
+A function that builds a balanced tree of n keys out
+of nodeClass and returns the number of bytes it took.
+The keys themselves are allocated before measuring so
+only the node overhead is counted.
+'''
+def measure(nodeClass, n):
+    keys = list(range(n))
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    bst.Node = nodeClass
+    try:
+        root = bst.buildBalanced(keys)
+    finally:
+        bst.Node = Node
+    used = tracemalloc.get_traced_memory()[0] - before
+    tracemalloc.stop()
+    del root
+    return used
+
+
+if __name__ == '__main__':
+    sizes = [int(arg) for arg in sys.argv[1:]] or [1000000, 10000000]
+    print("keys".rjust(12), "dict bytes/key".rjust(16), "slots bytes/key".rjust(16))
+    for n in sizes:
+        dictBytes = measure(DictNode, n)
+        slotBytes = measure(Node, n)
+        print(str(n).rjust(12), ("%.1f" % (dictBytes / n)).rjust(16), ("%.1f" % (slotBytes / n)).rjust(16))
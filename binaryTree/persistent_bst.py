@@ -0,0 +1,112 @@
+"""
+Persistent Binary Search Tree
+
+An immutable variant of the bst.py operations. Inserting
+never changes an existing node: the nodes on the path to
+the new key are copied and every other subtree is shared
+with the old tree. Any root that has been handed out is
+therefore a consistent snapshot that can be read with the
+normal bst.py functions (traversals, isBST, rank, ...)
+while writers keep inserting.
+"""
+import threading
+
+from bst_node import Node
+from bst import getHeight, getSize, search, inorderIter
+
+
+'''
+A function that returns a new node with the given value
+and children, with its height and size filled in.
+'''
+def _make(val, left, right):
+    node = Node(val)
+    node.left = left
+    node.right = right
+    node.height = 1 + max(getHeight(left), getHeight(right))
+    node.size = 1 + getSize(left) + getSize(right)
+    return node
+
+'''
+Builds the AVL balanced version of a node with value val
+and subtrees left and right, whose heights differ by at
+most 2. Only new nodes are created, so the subtrees
+passed in are left untouched.
+'''
+def _balance(val, left, right):
+    if getHeight(left) > getHeight(right) + 1:
+        if getHeight(left.left) >= getHeight(left.right):
+            # left-left case: single right rotation
+            return _make(left.val, left.left, _make(val, left.right, right))
+        # left-right case: double rotation
+        mid = left.right
+        return _make(mid.val, _make(left.val, left.left, mid.left), _make(val, mid.right, right))
+    if getHeight(right) > getHeight(left) + 1:
+        if getHeight(right.right) >= getHeight(right.left):
+            # right-right case: single left rotation
+            return _make(right.val, _make(val, left, right.left), right.right)
+        # right-left case: double rotation
+        mid = right.left
+        return _make(mid.val, _make(val, left, mid.left), _make(right.val, mid.right, right.right))
+    return _make(val, left, right)
+
+'''
+A function that returns the root of a new balanced tree
+holding every key of root plus key. root itself is not
+changed. If the key is already in the tree the same root
+is returned.
+'''
+def insertPersistent(root, key):
+    if root == None:
+        return Node(key)
+    if key == root.val:
+        return root
+    if key < root.val:
+        newLeft = insertPersistent(root.left, key)
+        if newLeft is root.left:
+            return root
+        return _balance(root.val, newLeft, root.right)
+    newRight = insertPersistent(root.right, key)
+    if newRight is root.right:
+        return root
+    return _balance(root.val, root.left, newRight)
+
+
+class PersistentBST:
+    '''
+    A tree that readers can take O(1) snapshots of while
+    writers insert. Writers build the new version off to
+    the side and publish it with a single assignment, so a
+    reader holding a snapshot never sees a partial update.
+    The lock only orders writers against each other.
+    '''
+    def __init__(self, root=None):
+        self.root = root
+        self.writeLock = threading.Lock()
+
+    def snapshot(self):
+        return self.root
+
+    def insert(self, key):
+        with self.writeLock:
+            self.root = insertPersistent(self.root, key)
+
+    def contains(self, key):
+        return search(self.root, key) != None
+
+    def __len__(self):
+        return getSize(self.root)
+
+    def __iter__(self):
+        return inorderIter(self.root)
+
+
+if __name__ == '__main__':
+    tree = PersistentBST()
+    for key in [10, 5, 15, 3, 9]:
+        tree.insert(key)
+    before = tree.snapshot()
+    tree.insert(8)
+    after = tree.snapshot()
+    print("Snapshot before inserting 8:", list(inorderIter(before)))
+    print("Snapshot after inserting 8: ", list(inorderIter(after)))
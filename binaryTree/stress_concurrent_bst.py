@@ -0,0 +1,74 @@
+"""
+Stress test for concurrent_bst.py
+
+Runs a mix of inserts and lookups from several threads at
+once, then checks that the tree is still a valid BST and
+that it holds exactly the keys the threads inserted.
+
+Usage: python stress_concurrent_bst.py [threads] [total operations]
+The defaults are 8 threads and 2,000,000 operations.
+"""
+import random
+import sys
+import threading
+import time
+
+from bst import isBST
+from concurrent_bst import ConcurrentBST
+
+
+'''
+The work done by one thread. Two thirds of the operations
+are inserts and the rest are lookups. Half of the threads
+insert into their own key range and the other half insert
+anywhere, so both disjoint and contended inserts happen.
+'''
+def worker(tree, threadId, numThreads, ops, keySpace, inserted):
+    rng = random.Random(threadId)
+    rangeSize = keySpace // numThreads
+    for i in range(ops):
+        if threadId % 2 == 0:
+            key = threadId * rangeSize + rng.randrange(rangeSize)
+        else:
+            key = rng.randrange(keySpace)
+        if rng.random() < 2 / 3:
+            tree.insert(key)
+            inserted.add(key)
+        else:
+            tree.contains(key)
+
+
+def runStressTest(numThreads, totalOps):
+    tree = ConcurrentBST()
+    keySpace = totalOps
+    opsPerThread = totalOps // numThreads
+    insertedSets = [set() for i in range(numThreads)]
+    threads = []
+    for i in range(numThreads):
+        t = threading.Thread(target=worker, args=(tree, i, numThreads, opsPerThread, keySpace, insertedSets[i]))
+        threads.append(t)
+    start = time.time()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    elapsed = time.time() - start
+
+    expected = set()
+    for keys in insertedSets:
+        expected.update(keys)
+    assert isBST(tree.root), "tree is not a valid BST"
+    assert len(tree) == len(expected), "count is %d, expected %d" % (len(tree), len(expected))
+    assert list(tree) == sorted(expected), "tree keys do not match the inserted keys"
+    print("%d operations on %d threads in %.2f seconds, %d keys, all checks passed"
+          % (opsPerThread * numThreads, numThreads, elapsed, len(expected)))
+
+
+if __name__ == '__main__':
+    numThreads = 8
+    totalOps = 2000000
+    if len(sys.argv) > 1:
+        numThreads = int(sys.argv[1])
+    if len(sys.argv) > 2:
+        totalOps = int(sys.argv[2])
+    runStressTest(numThreads, totalOps)
@@ -0,0 +1,67 @@
+"""
+Tests for btree.py
+
+Run with: python -m pytest binaryTree/test_btree.py
+"""
+import random
+
+import pytest
+
+from btree import BTree
+
+
+@pytest.mark.parametrize("cachePages", [1, 2, 3, 1024])
+def test_reopen_keeps_every_key(tmp_path, cachePages):
+    path = str(tmp_path / "keys.btree")
+    keys = list(range(3000))
+    random.Random(12).shuffle(keys)
+    with BTree(path, pageSize=64, cachePages=cachePages) as tree:
+        for key in keys:
+            assert tree.insert(key)
+        assert not tree.insert(keys[0])
+        assert list(tree.inorderIter()) == sorted(keys)
+    with BTree(path, cachePages=cachePages) as tree:
+        assert len(tree) == len(keys)
+        assert tree.pageSize == 64
+        assert list(tree.inorderIter()) == sorted(keys)
+        assert list(tree.range_iter(100, 199)) == list(range(100, 200))
+        assert sorted(tree.preorderIter()) == sorted(keys)
+        assert sorted(tree.postorderIter()) == sorted(keys)
+
+
+def test_large_page_size(tmp_path):
+    path = str(tmp_path / "big.btree")
+    with BTree(path, pageSize=1 << 20, cachePages=4) as tree:
+        for key in range(100000, 0, -1):
+            tree.insert(key)
+    with BTree(path) as tree:
+        assert list(tree.inorderIter()) == list(range(1, 100001))
+
+
+def test_traversal_strings(tmp_path):
+    with BTree(str(tmp_path / "small.btree")) as tree:
+        for key in [10, 5, 15, 3, 9, 8]:
+            tree.insert(key)
+        assert tree.getInorder() == "3-5-8-9-10-15-"
+        assert list(tree.range_iter(4, 9)) == [5, 8, 9]
+
+
+def test_rejects_empty_cache(tmp_path):
+    with pytest.raises(ValueError):
+        BTree(str(tmp_path / "none.btree"), cachePages=0)
+
+
+@pytest.mark.parametrize("key, error", [(1.5, TypeError), ("a", TypeError), (True, TypeError),
+                                        (2**63, ValueError), (-2**63 - 1, ValueError)])
+def test_rejects_keys_that_dont_fit(tmp_path, key, error):
+    path = str(tmp_path / "bad.btree")
+    with BTree(path, pageSize=64, cachePages=2) as tree:
+        for good in range(5):
+            tree.insert(good)
+        with pytest.raises(error):
+            tree.insert(key)
+        assert len(tree) == 5
+        assert tree.insert(2**63 - 1)
+        assert tree.insert(-2**63)
+    with BTree(path) as tree:
+        assert list(tree.inorderIter()) == [-2**63, 0, 1, 2, 3, 4, 2**63 - 1]
@@ -0,0 +1,57 @@
+"""
+Bitboard helpers for TicTacToe
+
+A bitboard stores one player's pieces as a single int,
+with the cell at (row, col) being bit row * size + col.
+A player has won if all the bits of one of the line
+masks are set, which is a single and + compare per line.
+"""
+
+
+def cell_bit(row, col, size=3):
+    return 1 << (row * size + col)
+
+
+# (row step, col step) along a row, a column and the two diagonals
+ROW = [(0, 1)]
+COL = [(1, 0)]
+DIAGONALS = [(1, 1), (1, -1)]
+ALL_DIRECTIONS = ROW + COL + DIAGONALS
+
+
+'''
+A function that returns the masks of every line of
+win_length cells in a row, column or diagonal on a
+size x size board, or only the lines going in the
+given directions.
+'''
+def line_masks(size=3, win_length=3, directions=ALL_DIRECTIONS):
+    masks = []
+    for dr, dc in directions:
+        for row in range(size):
+            for col in range(size):
+                end_row = row + dr * (win_length - 1)
+                end_col = col + dc * (win_length - 1)
+                if end_row >= size or end_col < 0 or end_col >= size:
+                    continue
+                mask = 0
+                for i in range(win_length):
+                    mask |= cell_bit(row + dr * i, col + dc * i, size)
+                masks.append(mask)
+    return masks
+
+
+def full_mask(size=3):
+    return (1 << (size * size)) - 1
+
+
+# the standard 3x3 board
+LINE_MASKS = line_masks()
+FULL_MASK = full_mask()
+
+
+def has_line(bits, masks=LINE_MASKS):
+    for mask in masks:
+        if bits & mask == mask:
+            return True
+    return False
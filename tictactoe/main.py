@@ -1,4 +1,14 @@
+import sys
+
 from tictactoe import *
 
-game = TicTacToe()
-game.play_game()
\ No newline at end of file
+# optional arguments: board size and how many in a row wins, e.g. "python main.py 15 5"
+size = 3
+win_length = None
+if len(sys.argv) > 1:
+    size = int(sys.argv[1])
+if len(sys.argv) > 2:
+    win_length = int(sys.argv[2])
+
+game = TicTacToe(size, win_length)
+game.play_game()
@@ -0,0 +1,262 @@
+"""
+Monte Carlo Tree Search for the TicTacToe AI
+
+An alternative to minimax for boards too big to search
+exhaustively. Each playout walks down the tree picking
+children by UCT (upper confidence bound), adds one new
+node, finishes the game with random moves using the
+game's own make_move/check_win/check_tie rules, and
+records the result on the way back up. The move played
+is the most visited child of the root.
+
+The search stops after a fixed number of playouts or when
+a time budget runs out, whichever comes first, so a move
+takes about the same time on any board size. The tree is
+kept between turns: on the next turn the search carries
+on from the node of the position actually reached.
+
+With leaf_workers > 0, each new node is also played out
+leaf_playouts extra times (leaf parallelization). Those
+playouts are split evenly over leaf_workers processes and
+run while the main process does its own playout, so with
+that many free cores a node gets leaf_playouts + 1
+playouts in about the time of leaf_playouts / leaf_workers.
+Each node costs a round trip to the pool, so it only pays
+off on boards where a playout is slow compared to that.
+"""
+import math
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from tictactoe import TicTacToe
+
+
+def _opponent(player):
+    if player == "O":
+        return "X"
+    return "O"
+
+
+class MCTSNode:
+    __slots__ = ("x_bits", "o_bits", "player", "parent", "move", "children", "untried", "visits", "reward")
+
+    def __init__(self, game, player, parent=None, move=None):
+        self.x_bits = game.bits["X"]
+        self.o_bits = game.bits["O"]
+        # the player to move in this position
+        self.player = player
+        self.parent = parent
+        self.move = move
+        self.children = []
+        if game.winner() == None:
+            self.untried = _empty_cells(game)
+            random.shuffle(self.untried)
+        else:
+            self.untried = []
+        self.visits = 0
+        # total reward for the player who made the move into this node
+        self.reward = 0.0
+
+    def uct_child(self, c):
+        log_visits = math.log(self.visits)
+        best = None
+        best_value = None
+        for child in self.children:
+            value = child.reward / child.visits + c * math.sqrt(log_visits / child.visits)
+            if best == None or value > best_value:
+                best = child
+                best_value = value
+        return best
+
+
+def _empty_cells(game):
+    # the (row, col) of every empty cell, read off the bitboards
+    # instead of checking each cell with is_valid_move
+    size = game.size
+    free = ~(game.bits["X"] | game.bits["O"]) & ((1 << (size * size)) - 1)
+    cells = []
+    while free:
+        low = free & -free
+        cell = low.bit_length() - 1
+        cells.append((cell // size, cell % size))
+        free ^= low
+    return cells
+
+
+'''
+Plays random moves until the game ends, then takes them
+back, and returns the winner ("X", "O" or "tie"). The
+empty cells are listed once, and each move removes its
+cell from the list, so a move doesn't rescan the board.
+'''
+def random_playout(game, player):
+    played = []
+    moves = _empty_cells(game)
+    result = game.winner()
+    while result == None:
+        i = random.randrange(len(moves))
+        row, col = moves[i]
+        # move the last cell into the chosen one's place
+        moves[i] = moves[-1]
+        moves.pop()
+        game.make_move(player, row, col)
+        played.append((row, col))
+        result = game.winner()
+        player = _opponent(player)
+    for row, col in played:
+        game.unmake_move(row, col)
+    return result
+
+
+def _reward(result, player):
+    # reward for player given the game's result
+    if result == player:
+        return 1.0
+    if result == "tie":
+        return 0.5
+    return 0.0
+
+
+def _split(total, parts):
+    # splits total into at most parts counts that differ by at most one
+    counts = []
+    for i in range(parts):
+        count = total // parts
+        if i < total % parts:
+            count += 1
+        if count > 0:
+            counts.append(count)
+    return counts
+
+
+# each worker process keeps one game object to play out on
+_worker_game = None
+
+
+def _leaf_playouts(size, win_length, board, player, count, seed):
+    # runs count playouts from board in a worker and returns
+    # the total reward for the player who just moved
+    global _worker_game
+    if _worker_game == None or _worker_game.size != size or _worker_game.win_length != win_length:
+        _worker_game = TicTacToe(size, win_length)
+    game = _worker_game
+    game.reset()
+    for row in range(size):
+        for col in range(size):
+            if board[row][col] != '-':
+                game.place_player(board[row][col], row, col)
+    random.seed(seed)
+    total = 0.0
+    for i in range(count):
+        total += _reward(random_playout(game, player), _opponent(player))
+    return total
+
+
+class MCTS:
+    def __init__(self, playouts=2000, time_budget=None, exploration=1.4, leaf_workers=0, leaf_playouts=8):
+        self.playouts = playouts
+        self.time_budget = time_budget
+        self.exploration = exploration
+        self.leaf_workers = leaf_workers
+        self.leaf_playouts = leaf_playouts
+        self.executor = None
+        self.root = None
+        self.playouts_done = 0
+
+    def configure(self, playouts, time_budget, leaf_workers, leaf_playouts):
+        # changes the search settings, keeping the tree
+        self.playouts = playouts
+        self.time_budget = time_budget
+        self.leaf_playouts = leaf_playouts
+        if leaf_workers != self.leaf_workers:
+            self.close()
+            self.leaf_workers = leaf_workers
+
+    def close(self):
+        if self.executor != None:
+            self.executor.shutdown()
+            self.executor = None
+
+    def _find_root(self, game, player):
+        # looks for the current position among the old root and the
+        # nodes up to two moves below it, so the tree can be reused
+        x_bits = game.bits["X"]
+        o_bits = game.bits["O"]
+        if self.root != None:
+            candidates = [self.root]
+            for child in self.root.children:
+                candidates.append(child)
+                candidates.extend(child.children)
+            for node in candidates:
+                if node.x_bits == x_bits and node.o_bits == o_bits and node.player == player:
+                    node.parent = None
+                    return node
+        return MCTSNode(game, player)
+
+    '''
+    Searches the position on game with player to move and
+    returns the (row, col) of the best move. The board is
+    left the way it was.
+    '''
+    def search(self, game, player):
+        root = self._find_root(game, player)
+        self.root = root
+        if self.leaf_workers > 0 and self.executor == None:
+            self.executor = ProcessPoolExecutor(self.leaf_workers)
+        deadline = None
+        if self.time_budget != None:
+            deadline = time.time() + self.time_budget
+        self.playouts_done = 0
+        while self.playouts_done < self.playouts:
+            if deadline != None and time.time() > deadline:
+                break
+            self._playout(game, root)
+        best = None
+        for child in root.children:
+            if best == None or child.visits > best.visits:
+                best = child
+        if best == None:
+            # no playout finished, so play any move
+            return game.get_moves()[0]
+        return best.move
+
+    def _playout(self, game, root):
+        node = root
+        path = []
+        # selection
+        while not node.untried and node.children:
+            node = node.uct_child(self.exploration)
+            game.make_move(_opponent(node.player), node.move[0], node.move[1])
+            path.append(node.move)
+        # expansion
+        if node.untried:
+            move = node.untried.pop()
+            game.make_move(node.player, move[0], move[1])
+            path.append(move)
+            child = MCTSNode(game, _opponent(node.player), node, move)
+            node.children.append(child)
+            node = child
+        # simulation: the extra leaf playouts are split over the workers
+        # and run while this process does its own playout
+        futures = []
+        if self.leaf_workers > 0 and game.winner() == None:
+            board = [list(row) for row in game.board]
+            for count in _split(self.leaf_playouts, self.leaf_workers):
+                futures.append(self.executor.submit(_leaf_playouts, game.size, game.win_length, board,
+                                                    node.player, count, random.getrandbits(32)))
+        visits = 1
+        reward = _reward(random_playout(game, node.player), _opponent(node.player))
+        if futures:
+            for future in futures:
+                reward += future.result()
+            visits += self.leaf_playouts
+        for row, col in path:
+            game.unmake_move(row, col)
+        # backpropagation: the reward flips sides at every level
+        while node != None:
+            node.visits += visits
+            node.reward += reward
+            reward = visits - reward
+            node = node.parent
+        self.playouts_done += 1
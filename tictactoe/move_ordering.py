@@ -0,0 +1,120 @@
+"""
+Move ordering for the alpha-beta search
+
+Alpha-beta prunes the most when the best move is searched
+first. MoveOrderer sorts the moves at each node by, in
+order of priority:
+    1. the transposition table's best move for the position
+    2. killer moves: moves that caused a cutoff at the same
+       ply in another part of the tree
+    3. the history heuristic: how often (weighted by depth)
+       a move has caused cutoffs anywhere in the search
+    4. a static score: the center first, then the corners
+
+Each heuristic can be turned off, and any object with the
+same methods can be used as TicTacToe.orderer. It also
+counts cutoffs, so report() shows how close the ordering
+is to ideal (in a perfectly ordered tree every cutoff
+happens on the first move).
+"""
+
+
+class MoveOrderer:
+    def __init__(self, size=3, use_static=True, use_killers=True, use_history=True, num_killers=2):
+        self.size = size
+        self.use_static = use_static
+        self.use_killers = use_killers
+        self.use_history = use_history
+        self.num_killers = num_killers
+        # static[(row, col)]: higher for the center and the corners
+        self.static = {}
+        center = (size - 1) / 2
+        for row in range(size):
+            for col in range(size):
+                score = -(abs(row - center) + abs(col - center))
+                if row in (0, size - 1) and col in (0, size - 1):
+                    score += size / 2
+                self.static[(row, col)] = score
+        # killers[ply] is a short list of the latest cutoff moves at that ply
+        self.killers = {}
+        # history[(player, row, col)] grows by depth^2 for every cutoff
+        self.history = {}
+        self.reset_stats()
+
+    def reset_stats(self):
+        self.nodes = 0
+        self.cutoffs = 0
+        self.first_move_cutoffs = 0
+        self.moves_before_cutoff = 0
+
+    '''
+    Called at the start of each move's search. Old history
+    scores are halved so they fade out over a game.
+    '''
+    def new_search(self):
+        for key in self.history:
+            self.history[key] //= 2
+        self.killers = {}
+        self.reset_stats()
+
+    def order(self, moves, player, ply, first_move=None):
+        self.nodes += 1
+        killers = []
+        if self.use_killers:
+            killers = self.killers.get(ply, [])
+
+        def priority(move):
+            score = 0
+            if move == first_move:
+                score += 1 << 40
+            if move in killers:
+                score += (1 << 30) * (len(killers) - killers.index(move))
+            if self.use_history:
+                score += self.history.get((player, move[0], move[1]), 0)
+            return score
+
+        def tie_break(move):
+            if self.use_static:
+                return self.static[move]
+            return 0
+
+        # sorted is stable, so equal moves keep their row-major order
+        return sorted(moves, key=lambda move: (priority(move), tie_break(move)), reverse=True)
+
+    '''
+    Called when the move at index in the ordered list
+    caused a beta cutoff.
+    '''
+    def record_cutoff(self, player, move, ply, depth, index):
+        self.cutoffs += 1
+        self.moves_before_cutoff += index
+        if index == 0:
+            self.first_move_cutoffs += 1
+        if self.use_killers:
+            killers = self.killers.setdefault(ply, [])
+            if move in killers:
+                killers.remove(move)
+            killers.insert(0, move)
+            del killers[self.num_killers:]
+        if self.use_history:
+            key = (player, move[0], move[1])
+            self.history[key] = self.history.get(key, 0) + depth * depth
+
+    def cutoff_rate(self):
+        if self.nodes == 0:
+            return 0.0
+        return self.cutoffs / self.nodes
+
+    def first_move_cutoff_rate(self):
+        if self.cutoffs == 0:
+            return 0.0
+        return self.first_move_cutoffs / self.cutoffs
+
+    def report(self):
+        average = 0.0
+        if self.cutoffs:
+            average = self.moves_before_cutoff / self.cutoffs
+        return ("%d nodes expanded, %d cutoffs (%.1f%% of nodes), %.1f%% on the first move, "
+                "%.2f moves tried before a cutoff on average"
+                % (self.nodes, self.cutoffs, 100 * self.cutoff_rate(),
+                   100 * self.first_move_cutoff_rate(), average))
@@ -0,0 +1,194 @@
+"""
+Parallel root search for the TicTacToe AI
+
+Splits the moves at the root of the search across a pool
+of worker processes, Young Brothers Wait style: the first
+(best ordered) move is searched on its own to get a good
+bound, then the remaining moves are searched in parallel.
+
+All workers share the best score found so far through a
+multiprocessing.Value. Each worker reads it when it starts
+a move and searches with it as alpha (beta when X is to
+move), so a move that can't beat the best one so far is
+cut off early instead of being searched exactly.
+
+Workers keep their own TicTacToe object (and so their own
+transposition table) between tasks; only the board is sent
+with each task. A worker clears its table when a task
+belongs to a new search.
+"""
+import multiprocessing
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from search_stats import SearchStats
+from tictactoe import TicTacToe, SearchTimeout
+from transposition import EXACT
+
+# set in each worker process by _init_worker
+_shared_bound = None
+_worker_game = None
+# the search_count of the search the worker's table belongs to
+_worker_search = None
+
+
+def _init_worker(shared_bound):
+    global _shared_bound
+    _shared_bound = shared_bound
+
+
+def _get_game(size, win_length, use_symmetry, search):
+    global _worker_game, _worker_search
+    game = _worker_game
+    if game == None or game.size != size or game.win_length != win_length:
+        game = TicTacToe(size, win_length)
+        game.orderer.new_search()
+        _worker_game = game
+    if game.use_symmetry != use_symmetry:
+        game.use_symmetry = use_symmetry
+        game.table.clear()
+    if search != _worker_search:
+        # entries from an earlier, deeper search would answer this
+        # one's probes, like TicTacToe.iterative_deepening explains
+        game.table.clear()
+        game.orderer.new_search()
+        _worker_search = search
+    return game
+
+
+def _set_board(game, board):
+    for row in range(game.size):
+        for col in range(game.size):
+            if game.board[row][col] != board[row][col]:
+                game.place_player(board[row][col], row, col)
+
+
+'''
+Searches one root move in a worker. Returns (score, nodes,
+stats): score is None if the time ran out or the move
+couldn't beat the shared bound (its score is then only a
+bound itself), nodes is how many nodes the worker searched,
+and stats is a SearchStats with the per-node details when
+detailed is True, else None.
+'''
+def _search_move(size, win_length, use_symmetry, search, board, player, move, depth, deadline, detailed,
+                 root_ply):
+    game = _get_game(size, win_length, use_symmetry, search)
+    _set_board(game, board)
+    game.deadline = deadline
+    start_nodes = game.nodes_searched
+    stats = None
+    if detailed:
+        stats = SearchStats("alpha_beta", player, root_ply)
+        game.stats = stats
+    bound = _shared_bound.value
+    if player == "O":
+        alpha, beta = bound, 10000
+    else:
+        alpha, beta = -10000, bound
+    row, col = move
+    game.make_move(player, row, col)
+    try:
+        score = game.minimax_alpha_beta(_opponent(player), depth - 1, alpha, beta)[0]
+    except SearchTimeout:
+        return (None, game.nodes_searched - start_nodes, stats)
+    finally:
+        game.deadline = None
+        game.stats = None
+        _set_board(game, board)
+    nodes = game.nodes_searched - start_nodes
+    with _shared_bound.get_lock():
+        if player == "O" and score > _shared_bound.value:
+            _shared_bound.value = score
+        elif player == "X" and score < _shared_bound.value:
+            _shared_bound.value = score
+        else:
+            return (None, nodes, stats)
+    return (score, nodes, stats)
+
+
+def _opponent(player):
+    if player == "O":
+        return "X"
+    return "O"
+
+
+class ParallelSearch:
+    def __init__(self, workers=None):
+        if workers == None:
+            workers = multiprocessing.cpu_count()
+        self.workers = workers
+        self.shared_bound = multiprocessing.Value("i", 0)
+        self.executor = ProcessPoolExecutor(workers, initializer=_init_worker, initargs=(self.shared_bound,))
+
+    def close(self):
+        self.executor.shutdown()
+
+    '''
+    Searches player's moves on game to the given depth and
+    returns (score, row, col), like minimax_alpha_beta.
+    Raises SearchTimeout if deadline passes first.
+    '''
+    def search(self, game, player, depth, deadline=None):
+        moves = game.search_moves()
+        # the table move from an earlier iteration goes first, mapped
+        # back from the table's orientation like in minimax_alpha_beta
+        first_move = None
+        key, t = game.position_key(player)
+        entry = game.table.get(key)
+        if entry != None:
+            first_move = game.symmetry.transform_cell(entry.row, entry.col, game.symmetry.inverse[t])
+        if game.orderer != None:
+            ply = game.pieces_placed()
+            moves = game.orderer.order(moves, player, ply, first_move)
+        elif first_move in moves:
+            moves = [first_move] + [move for move in moves if move != first_move]
+        if depth == 0 or game.check_win("X") or game.check_win("O") or game.check_tie():
+            return game.minimax_alpha_beta(player, depth, -10000, 10000)
+        # the root counts as a node, like in a serial search
+        game.nodes_searched += 1
+        if game.stats != None:
+            game.stats.visit(game.pieces_placed())
+
+        # the eldest brother is searched first, on its own
+        row, col = moves[0]
+        old_deadline = game.deadline
+        game.deadline = deadline
+        game.make_move(player, row, col)
+        try:
+            best = game.minimax_alpha_beta(_opponent(player), depth - 1, -10000, 10000)[0]
+        finally:
+            game.unmake_move(row, col)
+            game.deadline = old_deadline
+        best_move = moves[0]
+        self.shared_bound.value = best
+
+        board = [list(r) for r in game.board]
+        futures = []
+        detailed = game.stats != None
+        for move in moves[1:]:
+            futures.append(self.executor.submit(_search_move, game.size, game.win_length,
+                                                game.use_symmetry, game.search_count, board, player, move,
+                                                depth, deadline, detailed, game.pieces_placed()))
+        timed_out = False
+        for move, future in zip(moves[1:], futures):
+            score, nodes, stats = future.result()
+            # the workers' nodes count as searched by this game
+            game.nodes_searched += nodes
+            if stats != None and game.stats != None:
+                game.stats.merge(stats)
+            if score == None:
+                if deadline != None and time.time() > deadline:
+                    timed_out = True
+                continue
+            if (player == "O" and score > best) or (player == "X" and score < best):
+                best = score
+                best_move = move
+        if timed_out:
+            raise SearchTimeout()
+        # every move was searched with the full window or beat the
+        # shared bound, so the score is exact. Storing it lets the next
+        # iteration try best_move first.
+        row, col = game.symmetry.transform_cell(best_move[0], best_move[1], t)
+        game.table.store(key, depth, best, EXACT, row, col)
+        return (best, best_move[0], best_move[1])
@@ -0,0 +1,149 @@
+"""
+Precomputed perfect play for 3x3 TicTacToe
+
+Every board (with either player to move) is solved once,
+offline, with the same scoring as TicTacToe.minimax: +10
+if O wins, -10 if X wins and 0 for a tie. The best move
+and score for each one are written to a small binary
+table that TicTacToe memory maps at startup, so an
+"unbeatable" turn is a single table lookup.
+
+Run this file to (re)generate the table:
+    python perfect_play.py [path]
+
+Table layout: the 4 byte MAGIC, then one byte for each
+board with O to move followed by one byte for each board
+with X to move. A board's index is its cells read as a
+base 3 number (0 empty, 1 X, 2 O) with cell (0, 0) as the
+lowest digit. The low 4 bits of an entry are the best
+cell (row * 3 + col, 15 if the game is over) and the next
+2 bits are the score (0 for 0, 1 for +10, 2 for -10).
+"""
+import mmap
+import os
+import sys
+
+from bitboard import has_line, FULL_MASK
+
+MAGIC = b"TTT\x01"
+NUM_BOARDS = 3 ** 9
+NO_MOVE = 15
+SCORE_CODES = {0: 0, 10: 1, -10: 2}
+SCORES = {0: 0, 1: 10, 2: -10}
+DEFAULT_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "perfect_play.bin")
+
+
+def board_index(x_bits, o_bits):
+    index = 0
+    power = 1
+    for i in range(9):
+        if x_bits & (1 << i):
+            index += power
+        elif o_bits & (1 << i):
+            index += 2 * power
+        power *= 3
+    return index
+
+def entry_offset(x_bits, o_bits, player):
+    offset = len(MAGIC) + board_index(x_bits, o_bits)
+    if player == "X":
+        offset += NUM_BOARDS
+    return offset
+
+
+'''
+Solves a position and returns (score, cell). memo maps
+(x bits, o bits, player) to results already found.
+'''
+def solve(x_bits, o_bits, player, memo):
+    state = (x_bits, o_bits, player)
+    if state in memo:
+        return memo[state]
+    if has_line(o_bits):
+        result = (10, None)
+    elif has_line(x_bits):
+        result = (-10, None)
+    elif x_bits | o_bits == FULL_MASK:
+        result = (0, None)
+    else:
+        result = None
+        for cell in range(9):
+            bit = 1 << cell
+            if (x_bits | o_bits) & bit:
+                continue
+            if player == "O":
+                score = solve(x_bits, o_bits | bit, "X", memo)[0]
+                if result == None or score > result[0]:
+                    result = (score, cell)
+            else:
+                score = solve(x_bits | bit, o_bits, "O", memo)[0]
+                if result == None or score < result[0]:
+                    result = (score, cell)
+    memo[state] = result
+    return result
+
+
+def generate_table(path=DEFAULT_PATH):
+    table = bytearray(2 * NUM_BOARDS)
+    memo = {}
+    for index in range(NUM_BOARDS):
+        # decode the base 3 index back into bitboards
+        x_bits = 0
+        o_bits = 0
+        rest = index
+        for i in range(9):
+            digit = rest % 3
+            rest //= 3
+            if digit == 1:
+                x_bits |= 1 << i
+            elif digit == 2:
+                o_bits |= 1 << i
+        for player, offset in [("O", 0), ("X", NUM_BOARDS)]:
+            score, cell = solve(x_bits, o_bits, player, memo)
+            if cell == None:
+                cell = NO_MOVE
+            table[offset + index] = cell | (SCORE_CODES[score] << 4)
+    with open(path, "wb") as f:
+        f.write(MAGIC)
+        f.write(table)
+
+
+class PerfectPlayTable:
+    def __init__(self, data):
+        self.data = data
+
+    '''
+    Returns (score, row, col) for the position with player
+    to move, where row and col are None if the game is over.
+    '''
+    def lookup(self, x_bits, o_bits, player):
+        entry = self.data[entry_offset(x_bits, o_bits, player)]
+        score = SCORES[entry >> 4]
+        cell = entry & 0x0F
+        if cell == NO_MOVE:
+            return (score, None, None)
+        return (score, cell // 3, cell % 3)
+
+
+'''
+Memory maps the table at path and returns it, or returns
+None if there is no valid table there.
+'''
+def load_table(path=DEFAULT_PATH):
+    try:
+        with open(path, "rb") as f:
+            data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    except (OSError, ValueError):
+        return None
+    if len(data) != len(MAGIC) + 2 * NUM_BOARDS or data[:len(MAGIC)] != MAGIC:
+        data.close()
+        return None
+    return PerfectPlayTable(data)
+
+
+if __name__ == '__main__':
+    path = DEFAULT_PATH
+    if len(sys.argv) > 1:
+        path = sys.argv[1]
+    generate_table(path)
+    print("Wrote perfect play table to", path)
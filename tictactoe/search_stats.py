@@ -0,0 +1,96 @@
+"""
+Search statistics for the TicTacToe AI
+
+A SearchStats object is filled in while one search runs
+(see TicTacToe.start_stats/finish_stats) and kept as
+TicTacToe.last_stats afterwards. Only the node count and
+time are always filled in; the per-node fields need a
+detailed search. Depths are counted in
+moves from the root of the search. With a trace path set,
+every finished search is also appended to that file as
+one JSON object per line.
+"""
+import json
+import time
+
+
+class SearchStats:
+    def __init__(self, algorithm, player, root_ply, detailed=True):
+        self.algorithm = algorithm
+        # whether the per-node fields below (depths, cutoffs, table
+        # probes) were collected, or only the nodes and time
+        self.detailed = detailed
+        self.player = player
+        # pieces on the board when the search started
+        self.root_ply = root_ply
+        self.nodes = 0
+        self.max_depth = 0
+        self.cutoffs_by_depth = {}
+        self.first_move_cutoffs = 0
+        self.tt_probes = 0
+        self.tt_hits = 0
+        # deepest iteration of iterative deepening that finished
+        self.completed_depth = 0
+        self.start = time.perf_counter()
+        self.elapsed = 0.0
+
+    def visit(self, ply):
+        self.nodes += 1
+        depth = ply - self.root_ply
+        if depth > self.max_depth:
+            self.max_depth = depth
+
+    def cutoff(self, ply, index):
+        depth = ply - self.root_ply
+        self.cutoffs_by_depth[depth] = self.cutoffs_by_depth.get(depth, 0) + 1
+        if index == 0:
+            self.first_move_cutoffs += 1
+
+    def merge(self, other):
+        # adds the counts of other, e.g. from a worker process that
+        # searched part of the same tree
+        self.nodes += other.nodes
+        if other.max_depth > self.max_depth:
+            self.max_depth = other.max_depth
+        for depth, count in other.cutoffs_by_depth.items():
+            self.cutoffs_by_depth[depth] = self.cutoffs_by_depth.get(depth, 0) + count
+        self.first_move_cutoffs += other.first_move_cutoffs
+        self.tt_probes += other.tt_probes
+        self.tt_hits += other.tt_hits
+
+    def finish(self):
+        self.elapsed = time.perf_counter() - self.start
+
+    def cutoffs(self):
+        return sum(self.cutoffs_by_depth.values())
+
+    def nodes_per_second(self):
+        if self.elapsed == 0:
+            return 0.0
+        return self.nodes / self.elapsed
+
+    def to_dict(self):
+        return {
+            "algorithm": self.algorithm,
+            "player": self.player,
+            "detailed": self.detailed,
+            "nodes": self.nodes,
+            "elapsed_s": self.elapsed,
+            "nodes_per_second": self.nodes_per_second(),
+            "max_depth": self.max_depth,
+            "completed_depth": self.completed_depth,
+            "cutoffs": self.cutoffs(),
+            "cutoffs_by_depth": {str(depth): count for depth, count in sorted(self.cutoffs_by_depth.items())},
+            "first_move_cutoffs": self.first_move_cutoffs,
+            "tt_probes": self.tt_probes,
+            "tt_hits": self.tt_hits,
+        }
+
+    def write_trace(self, path):
+        with open(path, "a") as f:
+            f.write(json.dumps(self.to_dict()) + "\n")
+
+    def __str__(self):
+        return ("%s: %d nodes in %.4fs (%.0f nodes/s), max depth %d, %d cutoffs, %d/%d table hits"
+                % (self.algorithm, self.nodes, self.elapsed, self.nodes_per_second(), self.max_depth,
+                   self.cutoffs(), self.tt_hits, self.tt_probes))
@@ -0,0 +1,163 @@
+"""
+Headless self-play for TicTacToe
+
+Plays batches of games between two agents without a
+terminal and reports the win, loss and tie rates and
+how long each agent took per move. Games are split into
+chunks that run in parallel worker processes.
+
+Agents are named by strings: "random" plays
+take_random_turn, and "easy", "medium", "hard" and
+"unbeatable" play take_minimax_turn at that difficulty's
+search depth.
+
+Usage:
+    python simulate.py --x random --o unbeatable --games 100000 [--processes 8]
+                       [--size 3] [--win-length 3] [--seed 0]
+"""
+import argparse
+import math
+import multiprocessing
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from move_ordering import MoveOrderer
+from tictactoe import TicTacToe, DIFFICULTY_DEPTHS
+from transposition import TranspositionTable
+
+AGENTS = ["random"] + list(DIFFICULTY_DEPTHS)
+
+# move latencies are counted in buckets that are 5% wide
+_BUCKET_GROWTH = 1.05
+_MIN_LATENCY = 1e-7
+
+
+def make_agent(name, latencies, size=3):
+    # returns agent(game, player) for the named agent. The time each
+    # move takes is added to the latencies histogram.
+    if name == "random":
+        def move(game, player):
+            game.take_random_turn(player)
+    elif name in DIFFICULTY_DEPTHS:
+        depth = DIFFICULTY_DEPTHS[name]
+        # both agents play on the same game object, so each one brings
+        # its own table and move orderer. Otherwise what one agent
+        # learned would help the other and hide the gap between levels.
+        table = TranspositionTable()
+        orderer = MoveOrderer(size)
+
+        def move(game, player):
+            game.table = table
+            game.orderer = orderer
+            game.take_minimax_turn(player, depth)
+    else:
+        raise ValueError("unknown agent " + name)
+
+    def timed_move(game, player):
+        start = time.perf_counter()
+        move(game, player)
+        elapsed = time.perf_counter() - start
+        bucket = int(math.log(max(elapsed, _MIN_LATENCY) / _MIN_LATENCY, _BUCKET_GROWTH))
+        latencies[bucket] = latencies.get(bucket, 0) + 1
+    return timed_move
+
+
+'''
+Plays num_games games in this process and returns the
+results and latency histograms for them.
+'''
+def play_chunk(agent_x, agent_o, num_games, size, win_length, seed):
+    random.seed(seed)
+    game = TicTacToe(size, win_length)
+    game.verbose = False
+    game.time_budget = None
+    results = {"X": 0, "O": 0, "tie": 0}
+    latencies = {"X": {}, "O": {}}
+    x = make_agent(agent_x, latencies["X"], size)
+    o = make_agent(agent_o, latencies["O"], size)
+    for i in range(num_games):
+        game.reset()
+        results[game.play_headless(x, o)] += 1
+    game.close()
+    return results, latencies
+
+
+def percentile(histogram, fraction):
+    total = sum(histogram.values())
+    if total == 0:
+        return 0.0
+    target = fraction * total
+    seen = 0
+    for bucket in sorted(histogram):
+        seen += histogram[bucket]
+        if seen >= target:
+            # report the top of the bucket
+            return _MIN_LATENCY * _BUCKET_GROWTH ** (bucket + 1)
+    return 0.0
+
+
+'''
+Plays num_games games of agent_x against agent_o split
+over processes worker processes and returns a summary
+dict with the result rates and move latency percentiles.
+'''
+def run_batch(agent_x, agent_o, num_games, processes=None, size=3, win_length=None, seed=0, chunk_size=1000):
+    if processes == None:
+        processes = multiprocessing.cpu_count()
+    chunks = []
+    remaining = num_games
+    while remaining > 0:
+        chunks.append(min(chunk_size, remaining))
+        remaining -= chunk_size
+
+    results = {"X": 0, "O": 0, "tie": 0}
+    latencies = {"X": {}, "O": {}}
+    start = time.time()
+    with ProcessPoolExecutor(processes) as executor:
+        futures = [executor.submit(play_chunk, agent_x, agent_o, n, size, win_length, seed + i)
+                   for i, n in enumerate(chunks)]
+        for future in futures:
+            chunk_results, chunk_latencies = future.result()
+            for key in results:
+                results[key] += chunk_results[key]
+            for player in latencies:
+                for bucket, count in chunk_latencies[player].items():
+                    latencies[player][bucket] = latencies[player].get(bucket, 0) + count
+    elapsed = time.time() - start
+
+    summary = {
+        "agent_x": agent_x,
+        "agent_o": agent_o,
+        "games": num_games,
+        "seconds": elapsed,
+        "x_win_rate": results["X"] / num_games,
+        "o_win_rate": results["O"] / num_games,
+        "tie_rate": results["tie"] / num_games,
+    }
+    for player in ["X", "O"]:
+        for name, fraction in [("p50", 0.5), ("p90", 0.9), ("p99", 0.99), ("p999", 0.999)]:
+            summary[player.lower() + "_move_" + name + "_s"] = percentile(latencies[player], fraction)
+    return summary
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Play TicTacToe agents against each other")
+    parser.add_argument("--x", choices=AGENTS, default="random")
+    parser.add_argument("--o", choices=AGENTS, default="unbeatable")
+    parser.add_argument("--games", type=int, default=10000)
+    parser.add_argument("--processes", type=int, default=None)
+    parser.add_argument("--size", type=int, default=3)
+    parser.add_argument("--win-length", type=int, default=None)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    summary = run_batch(args.x, args.o, args.games, args.processes, args.size, args.win_length, args.seed)
+    print("%s (X) vs %s (O), %d games in %.1f seconds"
+          % (summary["agent_x"], summary["agent_o"], summary["games"], summary["seconds"]))
+    print("X wins %.2f%%, O wins %.2f%%, ties %.2f%%"
+          % (100 * summary["x_win_rate"], 100 * summary["o_win_rate"], 100 * summary["tie_rate"]))
+    for player in ["x", "o"]:
+        print("%s move latency: p50 %.1fus  p90 %.1fus  p99 %.1fus  p99.9 %.1fus"
+              % (player.upper(), 1e6 * summary[player + "_move_p50_s"], 1e6 * summary[player + "_move_p90_s"],
+                 1e6 * summary[player + "_move_p99_s"], 1e6 * summary[player + "_move_p999_s"]))
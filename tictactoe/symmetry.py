@@ -0,0 +1,111 @@
+"""
+Board symmetries for TicTacToe
+
+A square board has 8 symmetries (4 rotations, each with
+or without a reflection). Positions that are rotations or
+reflections of each other have the same minimax score, so
+the search can cache them under one canonical key and
+only needs to try one move out of each group of moves
+that are symmetric to each other.
+"""
+
+
+class Symmetries:
+    def __init__(self, size=3):
+        self.size = size
+        n = size - 1
+        # each symmetry as a function of (row, col)
+        maps = [
+            lambda r, c: (r, c),
+            lambda r, c: (c, n - r),
+            lambda r, c: (n - r, n - c),
+            lambda r, c: (n - c, r),
+            lambda r, c: (r, n - c),
+            lambda r, c: (n - r, c),
+            lambda r, c: (c, r),
+            lambda r, c: (n - c, n - r),
+        ]
+        # perms[t][i] is where symmetry t sends cell i
+        self.perms = []
+        for m in maps:
+            perm = []
+            for i in range(size * size):
+                r, c = m(i // size, i % size)
+                perm.append(r * size + c)
+            self.perms.append(perm)
+        # inverse[t] is the symmetry that undoes symmetry t
+        self.inverse = []
+        for perm in self.perms:
+            for u in range(len(self.perms)):
+                if all(self.perms[u][perm[i]] == i for i in range(size * size)):
+                    self.inverse.append(u)
+                    break
+        # on small boards every bitboard can be mapped with one lookup
+        self.tables = None
+        if size * size <= 9:
+            self.tables = []
+            for t in range(len(self.perms)):
+                self.tables.append([self._transform_slow(bits, t) for bits in range(1 << (size * size))])
+
+    def _transform_slow(self, bits, t):
+        perm = self.perms[t]
+        result = 0
+        i = 0
+        while bits:
+            if bits & 1:
+                result |= 1 << perm[i]
+            bits >>= 1
+            i += 1
+        return result
+
+    def transform(self, bits, t):
+        if self.tables != None:
+            return self.tables[t][bits]
+        return self._transform_slow(bits, t)
+
+    def transform_cell(self, row, col, t):
+        i = self.perms[t][row * self.size + col]
+        return (i // self.size, i % self.size)
+
+    '''
+    Returns (x bits, o bits, t) for the representative of
+    the position's symmetry group, where t is the symmetry
+    that maps the real board onto the representative.
+    '''
+    def canonical(self, x_bits, o_bits):
+        cells = self.size * self.size
+        best = None
+        for t in range(len(self.perms)):
+            tx = self.transform(x_bits, t)
+            to = self.transform(o_bits, t)
+            key = tx | (to << cells)
+            if best == None or key < best[0]:
+                best = (key, tx, to, t)
+        return (best[1], best[2], best[3])
+
+    '''
+    Returns the symmetries other than the identity that
+    leave the position unchanged.
+    '''
+    def stabilizer(self, x_bits, o_bits):
+        result = []
+        for t in range(1, len(self.perms)):
+            if self.transform(x_bits, t) == x_bits and self.transform(o_bits, t) == o_bits:
+                result.append(t)
+        return result
+
+    '''
+    Filters a list of (row, col) moves down to one move out
+    of each group of moves that are symmetric to each other
+    on this position, keeping the first in row-major order.
+    '''
+    def unique_moves(self, moves, x_bits, o_bits):
+        stabilizer = self.stabilizer(x_bits, o_bits)
+        if not stabilizer:
+            return moves
+        unique = []
+        for row, col in moves:
+            i = row * self.size + col
+            if all(self.perms[t][i] >= i for t in stabilizer):
+                unique.append((row, col))
+        return unique
@@ -1,5 +1,11 @@
 import random
 import time
+from transposition import TranspositionTable, EXACT, LOWER, UPPER
+from bitboard import has_line, line_masks, ROW, COL, DIAGONALS, ALL_DIRECTIONS
+from symmetry import Symmetries
+from perfect_play import load_table
+from move_ordering import MoveOrderer
+from search_stats import SearchStats
 """
 Brynn Brady
 AT CS - Ms. Namasivayam
@@ -7,32 +13,124 @@ February 18th 2022
 TicTacToe
 
 Current version: User vs. NPC with changeable difficulty levels tic tac toe (with alpha/beta efficiency)
+The board size and how many in a row it takes to win can be changed, e.g. TicTacToe(15, 5) for gomoku.
 """
 
+
+# search depth for each difficulty level
+DIFFICULTY_DEPTHS = {"easy": 3, "medium": 5, "hard": 7, "unbeatable": 10}
+
+
+class SearchTimeout(Exception):
+    # raised inside the search when the time budget for a move runs out
+    pass
+
+
 class TicTacToe:
-    def __init__(self):
+    def __init__(self, size=3, win_length=None):
         # TODO: Set up the board to be '-'
-        self.board = [['-', '-', '-'], ['-', '-', '-'], ['-', '-', '-']]
+        if win_length == None:
+            win_length = size
+        if win_length > size:
+            raise ValueError("win_length can't be bigger than the board")
+        self.size = size
+        self.win_length = win_length
+        self.board = [['-'] * size for i in range(size)]
+        # Zobrist hashing: one random 64 bit number per (cell, symbol).
+        # The hash of a board is the xor of the numbers for its filled
+        # cells, and make_move/unmake_move keep it up to date.
+        rng = random.Random(2022)
+        self.zobrist = {}
+        for row in range(size):
+            for col in range(size):
+                for player in ["X", "O"]:
+                    self.zobrist[(row, col, player)] = rng.getrandbits(64)
+        # xor'd in when X is the one to move
+        self.zobrist_x_to_move = rng.getrandbits(64)
+        self.hash = 0
+        # bitboards: one int per player with a bit set for each of
+        # their pieces, kept in step with self.board by make_move
+        self.bits = {"X": 0, "O": 0}
+        self.line_masks = line_masks(size, win_length, ALL_DIRECTIONS)
+        self.row_masks = line_masks(size, win_length, ROW)
+        self.col_masks = line_masks(size, win_length, COL)
+        self.diag_masks = line_masks(size, win_length, DIAGONALS)
+        # incremental win/tie state, kept up to date by make_move so
+        # check_win and check_tie don't have to look at the board:
+        # cell_lines[i] lists the lines (indexes into line_masks) through
+        # cell i, line_counts[player][line] counts player's pieces on each
+        # line, and lines_won[player] counts the lines player has filled
+        self.cell_lines = [[] for i in range(size * size)]
+        for line, mask in enumerate(self.line_masks):
+            for i in range(size * size):
+                if mask & (1 << i):
+                    self.cell_lines[i].append(line)
+        self.line_counts = {"X": [0] * len(self.line_masks), "O": [0] * len(self.line_masks)}
+        self.lines_won = {"X": 0, "O": 0}
+        self.empty_cells = size * size
+        self.table = TranspositionTable()
+        self.nodes_searched = 0
+        # how many times iterative_deepening has started a search
+        self.search_count = 0
+        # when on, the searches cache every rotation/reflection of a
+        # position under one key and skip moves that are symmetric
+        # to a move already tried (clear self.table if you change it).
+        # Mapping a big board is slow, so it starts off past 4x4.
+        self.use_symmetry = size <= 4
+        self.symmetry = Symmetries(size)
+        # solved best moves for every position (see perfect_play.py),
+        # None if the table file is missing or the board isn't 3x3
+        self.perfect_play = None
+        if size == 3 and win_length == 3:
+            self.perfect_play = load_table()
+        # sorts the moves at each alpha-beta node (see move_ordering.py),
+        # None searches them in row-major order
+        self.orderer = MoveOrderer(size)
+        # wall-clock seconds take_minimax_turn may spend, None for no limit
+        self.time_budget = 2.0
+        self.deadline = None
+        # with more than one worker the root moves are searched in
+        # parallel processes (see parallel_search.py)
+        self.workers = 1
+        self.parallel = None
+        # set to False to stop take_minimax_turn printing its timing
+        self.verbose = True
+        # the AI used by take_turn: "minimax", or "mcts" for Monte Carlo
+        # tree search (see mcts.py), which plays within the time budget
+        # on boards too big to search with minimax
+        self.ai = "minimax"
+        self.mcts = None
+        self.mcts_playouts = 5000
+        # leaf parallel MCTS: extra playouts per new node, split over
+        # this many worker processes (0 turns it off)
+        self.mcts_leaf_workers = 0
+        self.mcts_leaf_playouts = 8
+        # stats for the search running now (None when not searching) and
+        # the last one that finished, see search_stats.py. Every AI turn
+        # records its node count and time. Per-node details (depths,
+        # cutoffs, table hits) cost time at every node, so they are only
+        # collected by profile_search, when detailed_stats is on, or when
+        # trace_path is set, which appends every search to that file as
+        # a JSON line. self.stats is only set while collecting details.
+        self.current_stats = None
+        self.stats = None
+        self.last_stats = None
+        self.detailed_stats = False
+        self.trace_path = None
 
     def print_instructions(self):
         # TODO: Print the instructions to the game
         print("Welcome to TicTacToe!")
         print("This is a two player game. Take turns inserting X's and O's into the grid.")
-        print("The first person to score three in a row of their symbol wins!")
+        print("The first person to score", self.win_length, "in a row of their symbol wins!")
         return
 
     def getDifficultyLevel(self):
         while(True):
             diffLevel = input("Select a difficulty level. Type 'easy', 'medium', 'hard', or 'unbeatable'")
             # return the depth of tree depending on the difficulty they want
-            if diffLevel == "easy":
-                return 3
-            elif diffLevel == "medium":
-                return 5
-            elif diffLevel == "hard":
-                return 7
-            elif diffLevel == "unbeatable":
-                return 10
+            if diffLevel in DIFFICULTY_DEPTHS:
+                return DIFFICULTY_DEPTHS[diffLevel]
             else:
                 print("Bad input, try again")
 
@@ -41,9 +139,9 @@ class TicTacToe:
         # TODO: Print the board
         print()
         print("Current Board:")
-        print("   ", "0", " ", "1", " ", "2")
-        for i in range(3):
-            for j in range(3):
+        print(" ", "\t" + "\t".join([str(col) for col in range(self.size)]))
+        for i in range(self.size):
+            for j in range(self.size):
                 if j == 0:
                     print(i, "\t", end ="")
                 print(self.board[i][j], "\t", end ="")
@@ -52,20 +150,55 @@ class TicTacToe:
 
     def is_valid_move(self, row, col):
         # TODO: Check if the move is valid
-        if (row > 2 or col > 2):
+        if (row >= self.size or col >= self.size):
             return False
         elif (row < 0 or col < 0):
             return False
-        elif self.board[row][col] == '-':
-            return True
-        else:
+        elif (self.bits["X"] | self.bits["O"]) & self.cell_bit(row, col):
             return False
+        else:
+            return True
+
+    def cell_bit(self, row, col):
+        return 1 << (row * self.size + col)
 
     def place_player(self, player, row, col):
         # TODO: Place the player on the board
-        self.board[row][col] = player
+        if self.board[row][col] != '-':
+            self.unmake_move(row, col)
+        if player != '-':
+            self.make_move(player, row, col)
         return
 
+    def make_move(self, player, row, col):
+        # puts player on the empty cell (row, col) and updates the hash,
+        # the bitboards and the line counts to match. The searches use
+        # this and unmake_move instead of place_player(..., "-").
+        cell = row * self.size + col
+        self.hash ^= self.zobrist[(row, col, player)]
+        self.bits[player] |= 1 << cell
+        counts = self.line_counts[player]
+        for line in self.cell_lines[cell]:
+            counts[line] += 1
+            if counts[line] == self.win_length:
+                self.lines_won[player] += 1
+        self.empty_cells -= 1
+        self.board[row][col] = player
+
+    def unmake_move(self, row, col):
+        # takes back the piece on (row, col), the reverse of make_move
+        player = self.board[row][col]
+        cell = row * self.size + col
+        self.hash ^= self.zobrist[(row, col, player)]
+        self.bits[player] &= ~(1 << cell)
+        counts = self.line_counts[player]
+        for line in self.cell_lines[cell]:
+            if counts[line] == self.win_length:
+                self.lines_won[player] -= 1
+            counts[line] -= 1
+        self.empty_cells += 1
+        self.board[row][col] = '-'
+
     def take_manual_turn(self, player):
         # TODO: Ask the user for a row, col until a valid response
         #  is given them place the player's icon in the right spot
@@ -83,14 +216,101 @@ class TicTacToe:
     def take_random_turn(self, player):
         goodInput = False
         while(not goodInput):
-            randRow = random.randint(0, 2)
-            randCol = random.randint(0, 2)
+            randRow = random.randint(0, self.size - 1)
+            randCol = random.randint(0, self.size - 1)
             if self.is_valid_move(randRow, randCol):
                 self.place_player(player, randRow, randCol)
                 goodInput = True
         return
 
-    def minimax(self, player, depth):
+    def get_moves(self):
+        # every empty cell in row-major order
+        moves = []
+        for row in range(self.size):
+            for col in range(self.size):
+                if self.is_valid_move(row, col):
+                    moves.append((row, col))
+        return moves
+
+    def search_moves(self):
+        # the moves worth searching: with symmetry on, moves that are
+        # a rotation/reflection of an earlier move give the same score
+        moves = self.get_moves()
+        if self.use_symmetry:
+            moves = self.symmetry.unique_moves(moves, self.bits["X"], self.bits["O"])
+        return moves
+
+    def position_key(self, player):
+        # returns (key, t): the transposition table key of the position
+        # with player to move, and the symmetry t that maps the board
+        # onto the orientation the table entry is stored in
+        if self.use_symmetry:
+            x_bits, o_bits, t = self.symmetry.canonical(self.bits["X"], self.bits["O"])
+            cells = self.size * self.size
+            key = x_bits | (o_bits << cells)
+            if player == "X":
+                key |= 1 << (2 * cells)
+            return (key, t)
+        key = self.hash
+        if player == "X":
+            key ^= self.zobrist_x_to_move
+        return (key, 0)
+
+    def pieces_placed(self):
+        return self.size * self.size - self.empty_cells
+
+    def start_stats(self, algorithm, player, detailed=None):
+        if detailed == None:
+            detailed = self.detailed_stats or self.trace_path != None
+        stats = SearchStats(algorithm, player, self.pieces_placed(), detailed)
+        stats.start_nodes = self.nodes_searched
+        self.current_stats = stats
+        if detailed:
+            self.stats = stats
+        return stats
+
+    def finish_stats(self, nodes=None):
+        # nodes overrides the node count, otherwise without details it is
+        # the number of alpha-beta nodes searched since start_stats
+        stats = self.current_stats
+        if nodes != None:
+            stats.nodes = nodes
+        elif not stats.detailed:
+            stats.nodes = self.nodes_searched - stats.start_nodes
+        stats.finish()
+        if self.trace_path != None:
+            stats.write_trace(self.trace_path)
+        self.last_stats = stats
+        self.current_stats = None
+        self.stats = None
+        return stats
+
+    def abandon_stats(self):
+        # drops the stats of a search that ended with an exception
+        self.current_stats = None
+        self.stats = None
+
+    def profile_search(self, algorithm, player, depth):
+        # runs "minimax" or "alpha_beta" from the current position and
+        # returns (result, stats), for comparing the two
+        self.start_stats(algorithm, player, True)
+        try:
+            if algorithm == "minimax":
+                result = self.minimax(player, depth)
+            elif algorithm == "alpha_beta":
+                result = self.minimax_alpha_beta(player, depth, -10000, 10000)
+            else:
+                raise ValueError("unknown algorithm " + algorithm)
+            self.stats.completed_depth = depth
+        except BaseException:
+            self.abandon_stats()
+            raise
+        stats = self.finish_stats()
+        return (result, stats)
+
+    def minimax(self, player, depth, moves=None):
+        if self.stats != None:
+            self.stats.visit(self.pieces_placed())
         # base case
         if self.check_win("O"):
             return (10, None, None)
@@ -102,41 +322,45 @@ class TicTacToe:
             return (0, None, None)
 
         # recursive case
+        if moves == None:
+            moves = self.search_moves()
         if player == "O":
             best = -10000
             opt_row = -1
             opt_col = -1
-            for row in range(3):
-                for col in range(3):
-                    if self.is_valid_move(row, col):
-                        # place the symbol, calc score, restore board to normal
-                        self.place_player("O", row, col)
-                        score = self.minimax("X", depth - 1)[0]
-                        self.place_player("-", row, col)
-                        if score >= best:
-                            opt_row = row
-                            opt_col = col
-                            best = score
+            for row, col in moves:
+                # place the symbol, calc score, restore board to normal
+                self.make_move("O", row, col)
+                score = self.minimax("X", depth - 1)[0]
+                self.unmake_move(row, col)
+                if score >= best:
+                    opt_row = row
+                    opt_col = col
+                    best = score
             return (best, opt_row, opt_col)
         if player == "X":
             worst = 10000
             opt_row = -1
             opt_col = -1
-            for row in range(3):
-                for col in range(3):
-                    if self.is_valid_move(row, col):
-                        # place the symbol, calc score, restore board to normal
-                        self.place_player("X", row, col)
-                        score = self.minimax("O", depth - 1)[0]
-                        self.place_player("-", row, col)
-                        if score < worst:
-                            worst = score
-                            opt_row = row
-                            opt_col = col
+            for row, col in moves:
+                # place the symbol, calc score, restore board to normal
+                self.make_move("X", row, col)
+                score = self.minimax("O", depth - 1)[0]
+                self.unmake_move(row, col)
+                if score < worst:
+                    worst = score
+                    opt_row = row
+                    opt_col = col
             return (worst, opt_row, opt_col)
 
 
-    def minimax_alpha_beta(self, player, depth, alpha, beta):
+    def minimax_alpha_beta(self, player, depth, alpha, beta, moves=None):
+        self.nodes_searched += 1
+        if self.stats != None:
+            self.stats.visit(self.pieces_placed())
+        # checking the clock is slow, so only do it every 256 nodes
+        if self.deadline != None and self.nodes_searched & 255 == 0 and time.time() > self.deadline:
+            raise SearchTimeout()
         # base case
         if self.check_win("O"):
             return (10, None, None)
@@ -147,53 +371,192 @@ class TicTacToe:
         elif depth == 0:
             return (0, None, None)
 
+        # look the position up in the transposition table. An entry
+        # only counts if it was searched at least as deep as we need.
+        key, t = self.position_key(player)
+        entry = self.table.get(key)
+        if self.stats != None:
+            self.stats.tt_probes += 1
+            if entry != None and entry.depth >= depth:
+                self.stats.tt_hits += 1
+        first_move = None
+        if entry != None:
+            # the stored move is in the table's orientation, map it back.
+            # Even from a shallower search it is a good move to try first.
+            row, col = self.symmetry.transform_cell(entry.row, entry.col, self.symmetry.inverse[t])
+            first_move = (row, col)
+        if entry != None and entry.depth >= depth:
+            if entry.flag == EXACT:
+                return (entry.score, row, col)
+            if entry.flag == LOWER and entry.score > alpha:
+                alpha = entry.score
+            elif entry.flag == UPPER and entry.score < beta:
+                beta = entry.score
+            if alpha >= beta:
+                return (entry.score, row, col)
+        result = self.alpha_beta_search(player, depth, alpha, beta, moves, first_move)
+
+        # a score at or below alpha is only an upper bound and one
+        # at or above beta is only a lower bound
+        if result[0] <= alpha:
+            flag = UPPER
+        elif result[0] >= beta:
+            flag = LOWER
+        else:
+            flag = EXACT
+        row, col = self.symmetry.transform_cell(result[1], result[2], t)
+        self.table.store(key, depth, result[0], flag, row, col)
+        return result
+
+    def alpha_beta_search(self, player, depth, alpha, beta, moves=None, first_move=None):
         # recursive case
+        if moves == None:
+            moves = self.search_moves()
+        # the ply is how many pieces are on the board, so it means the
+        # same thing in every iteration of iterative deepening
+        ply = self.pieces_placed()
+        if self.orderer != None:
+            moves = self.orderer.order(moves, player, ply, first_move)
+        elif first_move in moves:
+            moves = [first_move] + [move for move in moves if move != first_move]
         if player == "O":
             best = -10000
             opt_row = -1
             opt_col = -1
-            for row in range(3):
-                for col in range(3):
-                    if self.is_valid_move(row, col):
-                        # place the symbol, calc score, restore board to normal
-                        self.place_player("O", row, col)
-                        score = self.minimax_alpha_beta("X", depth-1, alpha, beta)[0]
-                        self.place_player("-", row, col)
-                        if score >= best:
-                            opt_row = row
-                            opt_col = col
-                            best = score
-                        if score > alpha:
-                            alpha = score
-                        if alpha >= beta:
-                            return (best, opt_row, opt_col)
+            for i, (row, col) in enumerate(moves):
+                # place the symbol, calc score, restore board to normal
+                self.make_move("O", row, col)
+                score = self.minimax_alpha_beta("X", depth-1, alpha, beta)[0]
+                self.unmake_move(row, col)
+                # strictly better only: a later move that ties best
+                # may just be an upper bound after alpha was raised
+                if score > best:
+                    opt_row = row
+                    opt_col = col
+                    best = score
+                if score > alpha:
+                    alpha = score
+                if alpha >= beta:
+                    if self.orderer != None:
+                        self.orderer.record_cutoff(player, (row, col), ply, depth, i)
+                    if self.stats != None:
+                        self.stats.cutoff(ply, i)
+                    return (best, opt_row, opt_col)
             return (best, opt_row, opt_col)
         if player == "X":
             worst = 10000
             opt_row = -1
             opt_col = -1
-            for row in range(3):
-                for col in range(3):
-                    if self.is_valid_move(row, col):
-                        # place the symbol, calc score, restore board to normal
-                        self.place_player("X", row, col)
-                        score = self.minimax_alpha_beta("O", depth-1, alpha, beta)[0]
-                        self.place_player("-", row, col)
-                        if score < worst:
-                            worst = score
-                            opt_row = row
-                            opt_col = col
-                        if score < beta:
-                            beta = score
-                        if alpha >= beta:
-                            return (worst, opt_row, opt_col)
+            for i, (row, col) in enumerate(moves):
+                # place the symbol, calc score, restore board to normal
+                self.make_move("X", row, col)
+                score = self.minimax_alpha_beta("O", depth-1, alpha, beta)[0]
+                self.unmake_move(row, col)
+                if score < worst:
+                    worst = score
+                    opt_row = row
+                    opt_col = col
+                if score < beta:
+                    beta = score
+                if alpha >= beta:
+                    if self.orderer != None:
+                        self.orderer.record_cutoff(player, (row, col), ply, depth, i)
+                    if self.stats != None:
+                        self.stats.cutoff(ply, i)
+                    return (worst, opt_row, opt_col)
             return (worst, opt_row, opt_col)
 
+    def iterative_deepening(self, player, depth, time_budget=None):
+        # searches 1 move deep, then 2, ... up to depth, until time_budget
+        # seconds run out, and returns the result of the deepest search that
+        # finished. Each search leaves its best moves in the transposition
+        # table, which the next, deeper one tries first.
+        # The table starts empty on every call: entries left by a deeper
+        # search would answer this one's probes and make a depth-limited
+        # search (an easy difficulty) play at the deeper depth.
+        empty = self.get_moves()
+        depth = min(depth, len(empty))
+        self.table.clear()
+        # tells parallel workers to clear their tables as well
+        self.search_count += 1
+        if self.orderer != None:
+            self.orderer.new_search()
+        self.deadline = None
+        if time_budget != None:
+            self.deadline = time.time() + time_budget
+        result = None
+        try:
+            for d in range(1, depth + 1):
+                if self.workers > 1:
+                    result = self.parallel_search(player, d)
+                else:
+                    result = self.minimax_alpha_beta(player, d, -10000, 10000)
+                if self.current_stats != None:
+                    self.current_stats.completed_depth = d
+                if result[0] != 0:
+                    # a forced win or loss was found, searching deeper won't change it
+                    break
+        except SearchTimeout:
+            # the search stopped part way through, so put back the
+            # cells it had filled in
+            for row, col in empty:
+                if self.board[row][col] != '-':
+                    self.unmake_move(row, col)
+            if result == None:
+                # not even depth 1 finished, so play any move
+                result = (0, empty[0][0], empty[0][1])
+        finally:
+            self.deadline = None
+        return result
+
+    def parallel_search(self, player, depth):
+        # imported here because parallel_search imports this module
+        from parallel_search import ParallelSearch
+        if self.parallel == None or self.parallel.workers != self.workers:
+            self.close()
+            self.parallel = ParallelSearch(self.workers)
+        return self.parallel.search(self, player, depth, self.deadline)
+
+    def close(self):
+        # shuts down the worker processes, if any were started
+        if self.parallel != None:
+            self.parallel.close()
+            self.parallel = None
+        if self.mcts != None:
+            self.mcts.close()
+
+    def take_mcts_turn(self, player):
+        # imported here because mcts imports this module
+        from mcts import MCTS
+        if self.mcts == None:
+            self.mcts = MCTS()
+        # read the settings every turn so changes to them take effect
+        self.mcts.configure(self.mcts_playouts, self.time_budget, self.mcts_leaf_workers, self.mcts_leaf_playouts)
+        stats = self.start_stats("mcts", player)
+        row, col = self.mcts.search(self, player)
+        # for MCTS a node is one playout
+        self.finish_stats(self.mcts.playouts_done)
+        if self.verbose:
+            print("The turn took:", stats.elapsed, "seconds")
+        self.place_player(player, row, col)
+        return
+
     def take_minimax_turn(self, player, depth):
-        start = time.time()
-        score, row, col = self.minimax_alpha_beta(player, depth, -10000, 10000)
-        end = time.time()
-        print("The turn took:", end - start, "seconds")
+        if self.perfect_play != None and depth >= len(self.get_moves()):
+            # the search would reach the end of the game anyway, so the
+            # solved table gives the same answer without searching
+            self.start_stats("perfect_play", player)
+            score, row, col = self.perfect_play.lookup(self.bits["X"], self.bits["O"], player)
+        else:
+            self.start_stats("alpha_beta", player)
+            try:
+                score, row, col = self.iterative_deepening(player, depth, self.time_budget)
+            except BaseException:
+                self.abandon_stats()
+                raise
+        stats = self.finish_stats()
+        if self.verbose:
+            print("The turn took:", stats.elapsed, "seconds")
         self.place_player(player, row, col)
         return
 
@@ -202,47 +565,66 @@ class TicTacToe:
         print("Player ", player, ", it's your turn")
         if player == "X":
             self.take_manual_turn(player)
+        elif self.ai == "mcts":
+            self.take_mcts_turn(player)
         else:
             self.take_minimax_turn(player, depth)
         return
 
     def check_col_win(self, player):
         # TODO: Check col win
-        for col in range(3):
-            if self.board[0][col] == player and self.board[1][col] == player and self.board[2][col] == player:
-                return True
-        return False
+        return has_line(self.bits[player], self.col_masks)
 
     def check_row_win(self, player):
         # TODO: Check row win
-        for row in range(3):
-            if self.board[row][0] == player and self.board[row][1] == player and self.board[row][2] == player:
-                return True
-        return False
+        return has_line(self.bits[player], self.row_masks)
 
     def check_diag_win(self, player):
         # TODO: Check diagonal win
-        if self.board[0][0] == player and self.board[1][1] == player and self.board[2][2] == player:
-            return True
-        elif self.board[0][2] == player and self.board[1][1] == player and self.board[2][0] == player:
-            return True
-        return False
+        return has_line(self.bits[player], self.diag_masks)
 
     def check_win(self, player):
         # TODO: Check win
-        if (self.check_col_win(player) or self.check_row_win(player) or self.check_diag_win(player)):
-            return True
-        return False
+        return self.lines_won[player] > 0
 
     def check_tie(self):
         # TODO: Check tie
-        for row in range(3):
-            for col in range(3):
-                if self.board[row][col] == "-":
-                    return False
-        if self.check_win("X") == False and self.check_win("O") == False:
-            return True
-        return False
+        return self.empty_cells == 0 and self.lines_won["X"] == 0 and self.lines_won["O"] == 0
+
+    def reset(self):
+        # empties the board so the same object can play another game
+        for row in range(self.size):
+            for col in range(self.size):
+                if self.board[row][col] != '-':
+                    self.place_player('-', row, col)
+
+    def winner(self):
+        # "X" or "O" if that player has won, "tie", or None if the game isn't over
+        if self.check_win("X"):
+            return "X"
+        if self.check_win("O"):
+            return "O"
+        if self.check_tie():
+            return "tie"
+        return None
+
+    def play_headless(self, agent_x, agent_o):
+        # plays a whole game without input() or print(). Each agent is a
+        # function agent(game, player) that makes one move for player.
+        # Returns the winner as "X", "O" or "tie".
+        player = "X"
+        result = None
+        while result == None:
+            if player == "X":
+                agent_x(self, player)
+            else:
+                agent_o(self, player)
+            result = self.winner()
+            if player == "X":
+                player = "O"
+            else:
+                player = "X"
+        return result
 
     def play_game(self):
         # TODO: Play game
@@ -265,5 +647,6 @@ class TicTacToe:
                 player = "X"
             self.print_board()
         print("Game Over")
+        self.close()
         return
 
@@ -0,0 +1,69 @@
+"""
+Transposition table for the TicTacToe search
+
+Stores the result of searching a position so the same
+position reached through a different move order doesn't
+have to be searched again. Positions are identified by
+TicTacToe.position_key: with symmetry on, the bitboards of
+the canonical rotation/reflection of the board, otherwise
+the Zobrist hash that make_move/unmake_move keep up to
+date. Either way the player to move is part of the key.
+"""
+from collections import OrderedDict
+
+# what the stored score means
+EXACT = 0
+LOWER = 1  # the real score is at least this (the search was cut off)
+UPPER = 2  # the real score is at most this (no move beat alpha)
+
+
+class Entry:
+    __slots__ = ("depth", "score", "flag", "row", "col")
+
+    def __init__(self, depth, score, flag, row, col):
+        self.depth = depth
+        self.score = score
+        self.flag = flag
+        self.row = row
+        self.col = col
+
+
+class TranspositionTable:
+    '''
+    A table with room for capacity entries. When the same
+    position is stored twice, the entry searched to the
+    greater depth is kept. When the table is full, the
+    least recently used entry is evicted.
+    '''
+    def __init__(self, capacity=1 << 16):
+        self.capacity = capacity
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self):
+        return len(self.entries)
+
+    def get(self, key):
+        entry = self.entries.get(key)
+        if entry == None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        self.entries.move_to_end(key)
+        return entry
+
+    def store(self, key, depth, score, flag, row, col):
+        old = self.entries.get(key)
+        if old != None:
+            self.entries.move_to_end(key)
+            if old.depth > depth:
+                return
+        elif len(self.entries) >= self.capacity:
+            self.entries.popitem(last=False)
+        self.entries[key] = Entry(depth, score, flag, row, col)
+
+    def clear(self):
+        self.entries.clear()
+        self.hits = 0
+        self.misses = 0